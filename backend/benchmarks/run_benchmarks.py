@@ -0,0 +1,323 @@
+"""Micro-benchmarks for the backend hot paths
+
+Runs fully offline: weather comes from an in-process stand-in, the model is trained
+on a small synthetic set inside a temporary working directory and history queries
+run against a temporary SQLite file. Nothing in the source tree is written to.
+
+    cd backend
+    python -m benchmarks.run_benchmarks --save-baseline benchmarks/baseline.json
+    python -m benchmarks.run_benchmarks --compare benchmarks/baseline.json
+
+Each case reports latency percentiles, throughput and peak traced memory. With
+`--compare` a case regresses when its median latency grows by more than
+`--tolerance` over the baseline, and the run exits with status 1.
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import logging
+import os
+import platform
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import numpy as np
+
+from models.catalog import iter_locations
+from models.database import Database, INSERT_PREDICTION
+from models.prediction_model import PowerConsumptionPredictor
+from data.sample_dataset import generate_sample_dataset
+
+LOCATIONS = list(iter_locations())
+
+# Case sizes; --quick keeps the smaller half for a fast sanity run
+HORIZON_HOURS = [24, 72, 168]
+HISTORY_ROWS = [1_000, 10_000, 100_000]
+FEATURE_ROWS = [1_000, 10_000, 50_000]
+DATASET_DAYS = [7, 90, 365]
+
+class FakeWeatherService:
+    """Deterministic stand-in for WeatherService with the same `get_weather_data` shape"""
+
+    def __init__(self, seed: int = 0):
+        rng = np.random.default_rng(seed)
+        self.weather = {
+            location: {
+                "temperature": round(float(rng.uniform(15, 42)), 1),
+                "humidity": round(float(rng.uniform(20, 95)), 1),
+                "wind_speed": round(float(rng.uniform(2, 25)), 1),
+                "rainfall": round(float(rng.exponential(2)), 1),
+                "location": f"{location[1]}, {location[0]}",
+                "coordinates": "0.0000, 0.0000",
+                "last_updated": datetime.now().isoformat()
+            }
+            for location in LOCATIONS
+        }
+
+    async def get_weather_data(self, state: str, district: str) -> dict:
+        return self.weather[(state, district)]
+
+def summarize(samples_ns: list, items_per_call: int = 1) -> dict:
+    """Latency percentiles (ms) and throughput for a list of per-call timings"""
+    samples = np.asarray(samples_ns, dtype=np.float64) / 1e6
+    total_seconds = samples.sum() / 1e3
+    return {
+        'calls': len(samples),
+        'mean_ms': round(float(samples.mean()), 4),
+        'min_ms': round(float(samples.min()), 4),
+        'p50_ms': round(float(np.percentile(samples, 50)), 4),
+        'p90_ms': round(float(np.percentile(samples, 90)), 4),
+        'p99_ms': round(float(np.percentile(samples, 99)), 4),
+        'max_ms': round(float(samples.max()), 4),
+        'calls_per_second': round(len(samples) / total_seconds, 2) if total_seconds else None,
+        'items_per_second': round(len(samples) * items_per_call / total_seconds, 2) if total_seconds else None
+    }
+
+def bench(func, repeat: int, warmup: int = 1, setup=None, items_per_call: int = 1) -> dict:
+    """Time `func(setup())` `repeat` times, then trace one extra call for peak memory
+
+    `setup` runs outside the timed region, e.g. to hand each call a fresh copy of
+    data the function mutates. Memory is traced separately so tracemalloc overhead
+    does not leak into the latency numbers.
+    """
+    prepare = setup or (lambda: None)
+    for _ in range(warmup):
+        func(prepare())
+
+    samples = []
+    for _ in range(repeat):
+        arg = prepare()
+        started = time.perf_counter_ns()
+        func(arg)
+        samples.append(time.perf_counter_ns() - started)
+
+    arg = prepare()
+    tracemalloc.start()
+    try:
+        func(arg)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    result = summarize(samples, items_per_call)
+    result['peak_memory_kb'] = round(peak / 1024, 1)
+    return result
+
+def run_async(loop: asyncio.AbstractEventLoop, coroutine_function):
+    """Adapt an async callable to `bench`, driving it on a long-lived loop"""
+    return lambda arg: loop.run_until_complete(coroutine_function(arg))
+
+def train_predictor(n_training_samples: int) -> PowerConsumptionPredictor:
+    """Train a small model in-process; callers run this inside a scratch directory"""
+    predictor = PowerConsumptionPredictor(
+        n_training_samples=n_training_samples,
+        inference_workers=1,
+        prediction_cache_size=0
+    )
+    predictor.train_sync()
+    return predictor
+
+def bench_predict(loop, predictor, weather: FakeWeatherService, repeat: int) -> dict:
+    results = {}
+    calls = iter(range(10 ** 9))
+
+    async def predict(_):
+        # Walk the catalog so each call looks up a different location
+        state, district = LOCATIONS[next(calls) % len(LOCATIONS)]
+        weather_data = await weather.get_weather_data(state, district)
+        return await predictor.predict(state, district, weather_data, [])
+
+    results['predict'] = bench(run_async(loop, predict), repeat)
+
+    for hours in HORIZON_HOURS:
+        async def predict_horizon(_, hours=hours):
+            state, district = LOCATIONS[next(calls) % len(LOCATIONS)]
+            weather_data = await weather.get_weather_data(state, district)
+            return await predictor.predict_24h(state, district, weather_data, hours=hours)
+
+        results[f'predict_24h[hours={hours}]'] = bench(
+            run_async(loop, predict_horizon), repeat, items_per_call=hours
+        )
+    return results
+
+def seed_predictions(database: Database, n_rows: int, days: int = 30, seed: int = 0):
+    """Fill the predictions table with `n_rows` spread over the last `days` days and all districts"""
+    rng = np.random.default_rng(seed)
+    now = datetime.now(timezone.utc)
+    location_index = rng.integers(0, len(LOCATIONS), n_rows)
+    offsets = rng.uniform(0, days * 86400, n_rows)
+
+    rows = [
+        database._prediction_row(
+            LOCATIONS[i][0], LOCATIONS[i][1],
+            float(rng.uniform(2000, 20000)),
+            {"temperature": 30.0, "humidity": 60.0, "wind_speed": 10.0, "rainfall": 0.0},
+            float(rng.uniform(0.75, 0.95)),
+            timestamp=now - timedelta(seconds=float(offset))
+        )
+        for i, offset in zip(location_index, offsets)
+    ]
+
+    with contextlib.closing(sqlite3.connect(database.db_path)) as conn:
+        conn.execute("DELETE FROM predictions")
+        conn.executemany(INSERT_PREDICTION, rows)
+        conn.commit()
+
+def bench_history(loop, scratch: Path, sizes: list, repeat: int) -> dict:
+    results = {}
+    database = Database(str(scratch / "bench_predictions.db"))
+    loop.run_until_complete(database.init_db())
+    state, district = LOCATIONS[0]
+
+    try:
+        for n_rows in sizes:
+            seed_predictions(database, n_rows)
+            results[f'get_prediction_history[rows={n_rows}]'] = bench(
+                run_async(loop, lambda _: database.get_prediction_history(state, district, 7)), repeat
+            )
+            results[f'get_prediction_history[rows={n_rows},bucket=hour]'] = bench(
+                run_async(loop, lambda _: database.get_prediction_history(state, district, 7, bucket='hour')),
+                repeat
+            )
+    finally:
+        loop.run_until_complete(database.close())
+    return results
+
+def bench_prepare_features(predictor, sizes: list, repeat: int) -> dict:
+    results = {}
+    for n_rows in sizes:
+        data = predictor._generate_synthetic_data(n_rows, seed=1)
+        results[f'_prepare_features[rows={n_rows}]'] = bench(
+            predictor._prepare_features, repeat, setup=data.copy, items_per_call=n_rows
+        )
+    return results
+
+def bench_sample_dataset(scratch: Path, sizes: list, repeat: int) -> dict:
+    results = {}
+    output_dir = scratch / "sample_dataset"
+
+    def generate(days):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return generate_sample_dataset(days=days, output_dir=str(output_dir))
+
+    for days in sizes:
+        results[f'generate_sample_dataset[days={days}]'] = bench(
+            lambda _, days=days: generate(days), repeat, warmup=0
+        )
+    return results
+
+def environment() -> dict:
+    import pandas as pd
+    import sklearn
+
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'sklearn': sklearn.__version__,
+        'timestamp': datetime.now().isoformat()
+    }
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Print median latency against the baseline; return names of regressed cases"""
+    regressions = []
+    print(f"\n{'case':<45} {'baseline p50':>13} {'p50':>10} {'change':>9}")
+    for name, current in results.items():
+        previous = baseline.get('results', {}).get(name)
+        if previous is None:
+            print(f"{name:<45} {'-':>13} {current['p50_ms']:>10.3f} {'new':>9}")
+            continue
+        change = current['p50_ms'] / previous['p50_ms'] - 1 if previous['p50_ms'] else 0.0
+        flag = "  REGRESSION" if change > tolerance else ""
+        print(f"{name:<45} {previous['p50_ms']:>13.3f} {current['p50_ms']:>10.3f} {change:>+9.1%}{flag}")
+        if change > tolerance:
+            regressions.append(name)
+    return regressions
+
+def print_results(results: dict):
+    print(f"{'case':<45} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'calls/s':>10} {'peak KB':>10}")
+    for name, r in results.items():
+        print(f"{name:<45} {r['p50_ms']:>9.3f} {r['p90_ms']:>9.3f} {r['p99_ms']:>9.3f} "
+              f"{r['calls_per_second']:>10.1f} {r['peak_memory_kb']:>10.1f}")
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the backend hot paths offline")
+    parser.add_argument("--quick", action="store_true", help="smaller sizes and fewer repeats")
+    parser.add_argument("--repeat", type=int, default=None, help="timed calls per case")
+    parser.add_argument("--only", action="append", default=[],
+                        help="run cases whose name contains this text (repeatable)")
+    parser.add_argument("--training-samples", type=int, default=5000,
+                        help="synthetic rows used to train the benchmark model")
+    parser.add_argument("--output", help="write results as JSON to this path")
+    parser.add_argument("--save-baseline", help="write results as the baseline JSON to this path")
+    parser.add_argument("--compare", help="baseline JSON to compare median latencies against")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="allowed median latency increase before a case regresses (default 0.10)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    repeat = args.repeat or (20 if args.quick else 200)
+    slow_repeat = max(3, repeat // 20)
+
+    def sizes(all_sizes):
+        return all_sizes[:2] if args.quick else all_sizes
+
+    def wanted(group):
+        return not args.only or any(text in group for text in args.only)
+
+    # Resolve output paths before moving into the scratch directory
+    output_paths = [Path(p).resolve() for p in (args.output, args.save_baseline) if p]
+    baseline = json.loads(Path(args.compare).read_text()) if args.compare else None
+
+    results = {}
+    original_cwd = os.getcwd()
+    loop = asyncio.new_event_loop()
+    with tempfile.TemporaryDirectory(prefix="power-bench-") as scratch:
+        scratch = Path(scratch)
+        # The predictor saves its artifact under ./models; keep that out of the tree
+        os.chdir(scratch)
+        try:
+            needs_model = any(wanted(g) for g in ('predict', 'predict_24h', '_prepare_features'))
+            predictor = train_predictor(args.training_samples) if needs_model else None
+
+            if wanted('predict') or wanted('predict_24h'):
+                results.update(bench_predict(loop, predictor, FakeWeatherService(), repeat))
+            if wanted('get_prediction_history'):
+                results.update(bench_history(loop, scratch, sizes(HISTORY_ROWS), repeat))
+            if wanted('_prepare_features'):
+                results.update(bench_prepare_features(predictor, sizes(FEATURE_ROWS), slow_repeat))
+            if wanted('generate_sample_dataset'):
+                results.update(bench_sample_dataset(scratch, sizes(DATASET_DAYS), slow_repeat))
+
+            if predictor is not None:
+                predictor.close()
+        finally:
+            os.chdir(original_cwd)
+            loop.close()
+
+    print_results(results)
+    report = {'environment': environment(), 'quick': args.quick, 'results': results}
+    for path in output_paths:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(report, indent=2))
+        print(f"\nResults written to {path}")
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} case(s) slower than baseline by more than {args.tolerance:.0%}")
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
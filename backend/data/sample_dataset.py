@@ -1,137 +1,118 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
+from pathlib import Path
+import argparse
 import json
 
-def generate_sample_dataset():
-    """Generate comprehensive sample dataset for Indian power consumption"""
-    np.random.seed(42)
-    
-    # Define states and districts
-    states_districts = {
-        "Maharashtra": ["Mumbai", "Pune", "Nagpur", "Nashik", "Aurangabad"],
-        "Karnataka": ["Bangalore", "Mysore", "Hubli", "Mangalore", "Belgaum"],
-        "Tamil Nadu": ["Chennai", "Coimbatore", "Madurai", "Salem", "Tiruchirappalli"],
-        "Gujarat": ["Ahmedabad", "Surat", "Vadodara", "Rajkot", "Gandhinagar"],
-        "Rajasthan": ["Jaipur", "Jodhpur", "Kota", "Bikaner", "Udaipur"],
-        "West Bengal": ["Kolkata", "Howrah", "Durgapur", "Asansol", "Siliguri"],
-        "Uttar Pradesh": ["Lucknow", "Kanpur", "Agra", "Varanasi", "Meerut"],
-        "Haryana": ["Gurgaon", "Faridabad", "Panipat", "Ambala", "Hisar"],
-        "Punjab": ["Ludhiana", "Amritsar", "Jalandhar", "Patiala", "Bathinda"],
-        "Delhi": ["New Delhi", "Central Delhi", "South Delhi", "North Delhi", "East Delhi"]
-    }
+# Locations and per-state base loads are shared with the prediction model
+from models.catalog import BASE_INDUSTRIAL, STATE_BASE_CONSUMPTION, STATES_DISTRICTS
+
+# Population factors by district (relative to state average)
+DISTRICT_POPULATION_FACTORS = {
+    "Mumbai": 1.8, "Chennai": 1.6, "Bangalore": 1.7, "Kolkata": 1.5,
+    "New Delhi": 1.4, "Ahmedabad": 1.3, "Pune": 1.2, "Lucknow": 1.1,
+    "Jaipur": 1.2, "Ludhiana": 1.0
+}
+
+# Seasonal weather by month (index 1-12): temperature base, humidity base, mean rainfall
+# Summer (4-6): 35 / 45 / 0.5, Monsoon (7-9): 28 / 80 / 10,
+# Winter (12-2): 20 / 60 / 0.2, Spring/Post-monsoon: 26 / 65 / 2
+MONTH_TEMP_BASE = np.array([0, 20, 20, 26, 35, 35, 35, 28, 28, 28, 26, 26, 20])
+MONTH_HUMIDITY_BASE = np.array([0, 60, 60, 65, 45, 45, 45, 80, 80, 80, 65, 65, 60])
+MONTH_RAINFALL_SCALE = np.array([0, 0.2, 0.2, 2, 0.5, 0.5, 0.5, 10, 10, 10, 2, 2, 0.2])
+
+def generate_sample_dataset(days: int = 730, resolution_hours: int = 3, states_districts: dict = None,
+                            seed: int = 42, output_dir: str = "data"):
+    """Generate comprehensive sample dataset for Indian power consumption
     
-    # Base consumption by state (MW)
-    state_base_consumption = {
-        "Maharashtra": 18000, "Karnataka": 12000, "Tamil Nadu": 14000,
-        "Gujarat": 13000, "Rajasthan": 8000, "West Bengal": 9000,
-        "Uttar Pradesh": 16000, "Haryana": 6000, "Punjab": 7000, "Delhi": 5000
-    }
+    Rows cover the full (day, district, hour) grid: `days` days ending today, every
+    `resolution_hours` hours, for each district in `states_districts` (defaults to
+    STATES_DISTRICTS). All random draws are vectorized over the grid.
+    """
+    rng = np.random.default_rng(seed)
+    states_districts = states_districts or STATES_DISTRICTS
     
-    # Population factors by district (relative to state average)
-    district_population_factors = {
-        "Mumbai": 1.8, "Chennai": 1.6, "Bangalore": 1.7, "Kolkata": 1.5,
-        "New Delhi": 1.4, "Ahmedabad": 1.3, "Pune": 1.2, "Lucknow": 1.1,
-        "Jaipur": 1.2, "Ludhiana": 1.0
-    }
+    # Grid axes
+    start_date = datetime.now() - timedelta(days=days)
+    day_starts = (np.datetime64(start_date.replace(hour=0), 'us')
+                  + np.arange(days).astype('timedelta64[D]'))
+    slot_hours = np.arange(0, 24, resolution_hours)
+    districts = [(state, district) for state, names in states_districts.items() for district in names]
+    
+    n_days, n_districts, n_hours = len(day_starts), len(districts), len(slot_hours)
+    shape = (n_days, n_districts, n_hours)
+    n_rows = n_days * n_districts * n_hours
+    
+    # Per-axis attributes, broadcast to the full grid in (day, district, hour) order
+    day_index = pd.DatetimeIndex(day_starts)
+    month = np.broadcast_to(day_index.month.values[:, None, None], shape).ravel()
+    day_of_week = np.broadcast_to(day_index.dayofweek.values[:, None, None], shape).ravel()
+    hour = np.broadcast_to(slot_hours[None, None, :], shape).ravel()
+    
+    state_names = np.array([state for state, _ in districts])
+    district_names = np.array([district for _, district in districts])
+    base_consumption = np.array([STATE_BASE_CONSUMPTION[state] for state, _ in districts])
+    industrial_base = np.array([BASE_INDUSTRIAL[state] for state, _ in districts])
+    pop_factor = np.array([
+        DISTRICT_POPULATION_FACTORS.get(district.split("_")[0] if "_" in district else district, 1.0)
+        for _, district in districts
+    ])
+    district_axis = np.broadcast_to(np.arange(n_districts)[None, :, None], shape).ravel()
     
-    data = []
-    
-    # Generate data for past 2 years
-    start_date = datetime.now() - timedelta(days=730)
-    
-    for day_offset in range(730):
-        current_date = start_date + timedelta(days=day_offset)
-        
-        for state, districts in states_districts.items():
-            for district in districts:
-                for hour in range(0, 24, 3):  # Every 3 hours
-                    # Base consumption
-                    base_consumption = state_base_consumption[state]
-                    
-                    # Population factor
-                    pop_factor = district_population_factors.get(
-                        district.split("_")[0] if "_" in district else district, 1.0
-                    )
-                    
-                    # Seasonal weather simulation
-                    month = current_date.month
-                    
-                    if month in [4, 5, 6]:  # Summer
-                        temp_base = 35
-                        humidity_base = 45
-                        rainfall = np.random.exponential(0.5)
-                    elif month in [7, 8, 9]:  # Monsoon
-                        temp_base = 28
-                        humidity_base = 80
-                        rainfall = np.random.exponential(10)
-                    elif month in [12, 1, 2]:  # Winter
-                        temp_base = 20
-                        humidity_base = 60
-                        rainfall = np.random.exponential(0.2)
-                    else:  # Spring/Post-monsoon
-                        temp_base = 26
-                        humidity_base = 65
-                        rainfall = np.random.exponential(2)
-                    
-                    # Weather with daily variation
-                    temperature = temp_base + np.random.normal(0, 5)
-                    humidity = max(20, min(95, humidity_base + np.random.normal(0, 15)))
-                    wind_speed = np.random.uniform(5, 25)
-                    
-                    # Time factors
-                    time_factor = 1.0
-                    if 6 <= hour <= 9 or 18 <= hour <= 22:  # Peak hours
-                        time_factor = np.random.uniform(1.5, 1.9)
-                    elif 22 <= hour <= 24 or 0 <= hour <= 6:  # Night
-                        time_factor = np.random.uniform(0.5, 0.7)
-                    else:  # Day
-                        time_factor = np.random.uniform(1.0, 1.4)
-                    
-                    # Weekend factor
-                    weekend_factor = 0.8 if current_date.weekday() >= 5 else 1.0
-                    
-                    # Temperature effect (AC usage)
-                    if temperature > 30:
-                        ac_factor = 1 + (temperature - 30) * 0.04
-                    elif temperature < 15:
-                        heating_factor = 1 + (15 - temperature) * 0.02
-                        ac_factor = heating_factor
-                    else:
-                        ac_factor = 1.0
-                    
-                    # Industrial load
-                    industrial_base = {
-                        "Maharashtra": 0.85, "Karnataka": 0.75, "Tamil Nadu": 0.80,
-                        "Gujarat": 0.90, "Rajasthan": 0.60, "West Bengal": 0.70,
-                        "Uttar Pradesh": 0.65, "Haryana": 0.75, "Punjab": 0.70, "Delhi": 0.55
-                    }
-                    industrial_load = industrial_base[state] * weekend_factor
-                    
-                    # Calculate final consumption
-                    consumption = (base_consumption * pop_factor * time_factor * 
-                                 ac_factor * industrial_load * 
-                                 np.random.uniform(0.9, 1.1))
-                    
-                    data.append({
-                        'timestamp': current_date.replace(hour=hour),
-                        'state': state,
-                        'district': district,
-                        'temperature': round(temperature, 2),
-                        'humidity': round(humidity, 2),
-                        'wind_speed': round(wind_speed, 2),
-                        'rainfall': round(rainfall, 2),
-                        'population_factor': round(pop_factor, 3),
-                        'industrial_load': round(industrial_load, 3),
-                        'hour': hour,
-                        'day_of_week': current_date.weekday(),
-                        'month': month,
-                        'is_weekend': int(current_date.weekday() >= 5),
-                        'power_consumption_mw': round(consumption, 2)
-                    })
-    
-    df = pd.DataFrame(data)
-    df.to_csv("data/india_power_consumption_dataset.csv", index=False)
+    # Seasonal weather simulation
+    rainfall = rng.exponential(MONTH_RAINFALL_SCALE[month])
+    temperature = MONTH_TEMP_BASE[month] + rng.normal(0, 5, n_rows)
+    humidity = np.clip(MONTH_HUMIDITY_BASE[month] + rng.normal(0, 15, n_rows), 20, 95)
+    wind_speed = rng.uniform(5, 25, n_rows)
+    
+    # Time factors: peak hours, night, day
+    is_peak = ((6 <= hour) & (hour <= 9)) | ((18 <= hour) & (hour <= 22))
+    is_night = ~is_peak & ((hour >= 22) | (hour <= 6))
+    low = np.select([is_peak, is_night], [1.5, 0.5], 1.0)
+    high = np.select([is_peak, is_night], [1.9, 0.7], 1.4)
+    time_factor = rng.uniform(low, high)
+    
+    # Weekend factor
+    is_weekend = day_of_week >= 5
+    weekend_factor = np.where(is_weekend, 0.8, 1.0)
+    
+    # Temperature effect (AC usage, heating below 15C)
+    ac_factor = np.where(
+        temperature > 30, 1 + (temperature - 30) * 0.04,
+        np.where(temperature < 15, 1 + (15 - temperature) * 0.02, 1.0)
+    )
+    
+    # Industrial load
+    industrial_load = industrial_base[district_axis] * weekend_factor
+    
+    # Calculate final consumption
+    consumption = (base_consumption[district_axis] * pop_factor[district_axis] * time_factor *
+                   ac_factor * industrial_load * rng.uniform(0.9, 1.1, n_rows))
+    
+    timestamps = (np.broadcast_to(day_starts[:, None, None], shape).ravel()
+                  + hour.astype('timedelta64[h]'))
+    
+    df = pd.DataFrame({
+        'timestamp': timestamps,
+        'state': state_names[district_axis],
+        'district': district_names[district_axis],
+        'temperature': np.round(temperature, 2),
+        'humidity': np.round(humidity, 2),
+        'wind_speed': np.round(wind_speed, 2),
+        'rainfall': np.round(rainfall, 2),
+        'population_factor': np.round(pop_factor[district_axis], 3),
+        'industrial_load': np.round(industrial_load, 3),
+        'hour': hour,
+        'day_of_week': day_of_week,
+        'month': month,
+        'is_weekend': is_weekend.astype(int),
+        'power_consumption_mw': np.round(consumption, 2)
+    })
+    
+    output = Path(output_dir)
+    output.mkdir(parents=True, exist_ok=True)
+    df.to_csv(output / "india_power_consumption_dataset.csv", index=False)
     
     # Create summary statistics
     summary = {
@@ -150,7 +131,7 @@ def generate_sample_dataset():
         }
     }
     
-    with open("data/dataset_summary.json", "w") as f:
+    with open(output / "dataset_summary.json", "w") as f:
         json.dump(summary, f, indent=2, default=str)
     
     print(f"Generated dataset with {len(df)} records")
@@ -158,4 +139,14 @@ def generate_sample_dataset():
     return df
 
 if __name__ == "__main__":
-    generate_sample_dataset()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Generate the sample power consumption dataset")
+    parser.add_argument("--days", type=int, default=730, help="number of days of history")
+    parser.add_argument("--resolution-hours", type=int, default=3, help="hours between samples")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output-dir", default="data")
+    args = parser.parse_args()
+    
+    generate_sample_dataset(
+        days=args.days, resolution_hours=args.resolution_hours,
+        seed=args.seed, output_dir=args.output_dir
+    )
\ No newline at end of file
@@ -1,20 +1,38 @@
-from fastapi import FastAPI, HTTPException
+import time
+_IMPORT_STARTED = time.perf_counter()
+
+from fastapi import FastAPI, File, HTTPException, Query, Request, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import List, Optional
-import pandas as pd
-import numpy as np
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
 import asyncio
-import httpx
-from datetime import datetime, timedelta
+import contextlib
+from datetime import datetime
 import json
-import sqlite3
-from pathlib import Path
+import logging
 import os
 
+from models.catalog import STATES_DISTRICTS, is_known, iter_locations
 from models.prediction_model import PowerConsumptionPredictor
 from models.weather_service import WeatherService
-from models.database import Database
+from models.database import Database, INGEST_CHUNK_ROWS
+from models.metrics import REGISTRY, CONTENT_TYPE, PREDICT_STAGE_SECONDS, FORECAST_GRID_LOOKUPS
+from models.stream import PredictionBroadcaster
+from models.forecast_grid import ForecastGrid
+
+# Startup timings reported by /api/ready
+startup_state = {
+    "ready": False,
+    "error": None,
+    "timings": {"import_seconds": round(time.perf_counter() - _IMPORT_STARTED, 3)}
+}
+
+# "background" accepts connections immediately and loads/trains the model afterwards;
+# "blocking" finishes loading before the server starts accepting requests
+STARTUP_MODE = os.getenv("STARTUP_MODE", "background")
+# Held so the loop cannot garbage-collect the background warm-up and shutdown can cancel it
+warm_up_task: Optional[asyncio.Task] = None
 
 app = FastAPI(title="India Power Consumption Prediction API", version="1.0.0")
 
@@ -28,13 +46,66 @@ app.add_middleware(
 )
 
 # Initialize services
-weather_service = WeatherService()
-predictor = PowerConsumptionPredictor()
-database = Database()
+weather_service = WeatherService(
+    cache_ttl=float(os.getenv("WEATHER_CACHE_TTL", "900")),
+    cache_stale_ttl=float(os.getenv("WEATHER_CACHE_STALE_TTL", "3600")),
+    cache_max_entries=int(os.getenv("WEATHER_CACHE_MAX_ENTRIES", "1024")),
+    max_connections=int(os.getenv("WEATHER_MAX_CONNECTIONS", "100")),
+    max_keepalive_connections=int(os.getenv("WEATHER_MAX_KEEPALIVE", "20")),
+    snapshot_max_age=float(os.getenv("WEATHER_SNAPSHOT_MAX_AGE", "1800"))
+)
+WEATHER_REFRESH_INTERVAL = float(os.getenv("WEATHER_REFRESH_INTERVAL", "600"))
+predictor = PowerConsumptionPredictor(
+    n_training_samples=int(os.getenv("TRAINING_SAMPLES", "10000")),
+    inference_workers=int(os.getenv("INFERENCE_WORKERS", "4")),
+    training_workers=int(os.getenv("TRAINING_WORKERS", "1")),
+    compiled_inference=os.getenv("COMPILED_INFERENCE", "1") != "0",
+    model_load_mode=os.getenv("MODEL_LOAD_MODE", "joblib"),
+    prediction_cache_ttl=float(os.getenv("PREDICTION_CACHE_TTL", "900")),
+    prediction_cache_size=int(os.getenv("PREDICTION_CACHE_SIZE", "4096"))
+)
+database = Database(
+    os.getenv("DATABASE_URL", "data/predictions.db"),
+    batch_size=int(os.getenv("DB_WRITE_BATCH_SIZE", "500")),
+    flush_interval=float(os.getenv("DB_FLUSH_INTERVAL", "1.0")),
+    queue_size=int(os.getenv("DB_WRITE_QUEUE_SIZE", "10000")),
+    archive_dir=os.getenv("ARCHIVE_DIR", "data/archive/predictions")
+)
+RETENTION_DAYS = float(os.getenv("RETENTION_DAYS", "90"))
+RETENTION_INTERVAL = float(os.getenv("RETENTION_INTERVAL", "3600"))
+
+# Scrape-time metrics over the service instances
+def _cache_stat(field):
+    return lambda: {
+        ("weather",): weather_service.cache.stats()[field],
+        ("prediction",): predictor.cache_stats().get(field)
+    }
+
+REGISTRY.gauge("power_cache_hit_ratio", "Share of cache lookups served from cache, stale included",
+               _cache_stat("hit_ratio"), labelnames=("cache",))
+REGISTRY.gauge("power_cache_entries", "Entries currently cached", _cache_stat("size"), labelnames=("cache",))
+REGISTRY.callback_counter("power_cache_evictions_total", "Entries evicted since startup",
+                          _cache_stat("evictions"), labelnames=("cache",))
+REGISTRY.gauge("power_db_write_queue_depth", "Predictions queued for the background writer",
+               database.queue_depth)
+REGISTRY.gauge("power_weather_snapshot_age_seconds", "Age of the bulk weather snapshot",
+               lambda: weather_service.cache_stats()["snapshot_age_seconds"])
+REGISTRY.gauge("power_model_ready", "1 once the model is loaded", lambda: int(predictor.is_trained))
 
 class PredictionRequest(BaseModel):
     state: str
     district: str
+    horizon_hours: int = Field(24, ge=1, le=168)
+    # Skip the precomputed forecast grid and compute from live weather
+    fresh: bool = False
+
+class LocationRequest(BaseModel):
+    state: str
+    district: str
+
+class BatchPredictionRequest(BaseModel):
+    locations: List[LocationRequest] = Field(..., min_length=1, max_length=500)
+    horizon_hours: int = Field(24, ge=1, le=168)
 
 class PredictionResponse(BaseModel):
     state: str
@@ -46,88 +117,420 @@ class PredictionResponse(BaseModel):
     predictions_24h: List[dict]
     timestamp: str
 
+class BatchPredictionResponse(BaseModel):
+    predictions: List[PredictionResponse]
+    timestamp: str
+
+def _no_stage(name: str):
+    return contextlib.nullcontext()
+
+async def predict_location_list(locations: list, hours: int = 24, stage=_no_stage) -> List[PredictionResponse]:
+    """Batch-predict (state, district) pairs and queue the results for storage
+    
+    Returns one PredictionResponse per location, in order. `stage(name)` wraps the
+    weather, predict and store steps, for the endpoint latency histograms.
+    """
+    # Fetch weather for every location concurrently
+    with stage("weather"):
+        weather = await asyncio.gather(*[
+            weather_service.get_weather_data(state, district) for state, district in locations
+        ])
+    
+    # Score all locations with one call per model
+    with stage("predict"):
+        results = await predictor.predict_batch(
+            [
+                {'state': state, 'district': district, 'weather_data': weather_data}
+                for (state, district), weather_data in zip(locations, weather)
+            ],
+            hours=hours
+        )
+    
+    # Queue all predictions; the writer stores them in batched transactions
+    with stage("store"):
+        await database.store_predictions([
+            {
+                'state': state,
+                'district': district,
+                'prediction': prediction_result['prediction'],
+                'weather_data': weather_data,
+                'confidence': prediction_result['confidence']
+            }
+            for (state, district), weather_data, (prediction_result, _) in zip(locations, weather, results)
+        ])
+    
+    timestamp = datetime.now().isoformat()
+    return [
+        PredictionResponse(
+            state=state,
+            district=district,
+            current_prediction=prediction_result['prediction'],
+            confidence_score=prediction_result['confidence'],
+            weather_data=weather_data,
+            parameters=prediction_result['parameters'],
+            predictions_24h=predictions_24h,
+            timestamp=timestamp
+        )
+        for (state, district), weather_data, (prediction_result, predictions_24h)
+        in zip(locations, weather, results)
+    ]
+
+async def predict_locations(locations: list, hours: int = 24) -> dict:
+    """`predict_location_list` keyed by (state, district), for the grid and the stream"""
+    return dict(zip(locations, await predict_location_list(locations, hours)))
+
+# Current and 24-hour predictions for every catalog district, recomputed on a schedule
+# once the model is ready; /api/predict and the stream answer from it while it is fresh
+FORECAST_GRID_INTERVAL = float(os.getenv("FORECAST_GRID_INTERVAL", "300"))
+forecast_grid = ForecastGrid(
+    predict_locations,
+    list(iter_locations()),
+    interval=FORECAST_GRID_INTERVAL,
+    max_age=float(os.getenv("FORECAST_GRID_MAX_AGE", "900"))
+)
+
+# Incremental learning from ingested actuals, in the training process pool
+MODEL_UPDATE_INTERVAL = float(os.getenv("MODEL_UPDATE_INTERVAL", "3600"))
+MODEL_UPDATE_MIN_ROWS = int(os.getenv("MODEL_UPDATE_MIN_ROWS", "500"))
+MODEL_UPDATE_MAX_ROWS = int(os.getenv("MODEL_UPDATE_MAX_ROWS", "100000"))
+RF_ADD_TREES = int(os.getenv("RF_ADD_TREES", "10"))
+RF_MAX_TREES = int(os.getenv("RF_MAX_TREES", "300"))
+GB_WINDOW_ROWS = int(os.getenv("GB_WINDOW_ROWS", "20000"))
+# Seconds between checks for a model another worker (or the training CLI) stored
+MODEL_RELOAD_INTERVAL = float(os.getenv("MODEL_RELOAD_INTERVAL", "60"))
+model_updater: Optional[asyncio.Task] = None
+
+async def update_model_from_actuals() -> Optional[dict]:
+    """Fold actuals ingested since the last update into the model, then refresh the grid"""
+    new_actuals = await database.get_actuals(after_id=predictor.actuals_watermark, limit=MODEL_UPDATE_MAX_ROWS)
+    if len(new_actuals) < MODEL_UPDATE_MIN_ROWS:
+        return None
+    
+    window_actuals = await database.get_actuals(limit=GB_WINDOW_ROWS, latest=True)
+    summary = await predictor.update_model(
+        new_actuals, window_actuals if len(window_actuals) >= MODEL_UPDATE_MIN_ROWS else [],
+        rf_add_trees=RF_ADD_TREES, rf_max_trees=RF_MAX_TREES
+    )
+    if FORECAST_GRID_INTERVAL > 0:
+        await forecast_grid.refresh()
+    return summary
+
+async def model_update_loop():
+    """Reload models stored by other workers and update from actuals on schedule"""
+    loop = asyncio.get_running_loop()
+    next_update = loop.time() + MODEL_UPDATE_INTERVAL if MODEL_UPDATE_INTERVAL > 0 else float("inf")
+    while True:
+        wait = next_update - loop.time()
+        if MODEL_RELOAD_INTERVAL > 0:
+            wait = min(wait, MODEL_RELOAD_INTERVAL)
+        await asyncio.sleep(max(0.0, wait))
+        try:
+            if MODEL_RELOAD_INTERVAL > 0 and await predictor.reload_if_updated() and FORECAST_GRID_INTERVAL > 0:
+                await forecast_grid.refresh()
+            if loop.time() >= next_update:
+                next_update = loop.time() + MODEL_UPDATE_INTERVAL
+                await update_model_from_actuals()
+        except Exception as e:
+            logging.error(f"Model update from actuals failed: {e}")
+
+REGISTRY.gauge("power_forecast_grid_age_seconds", "Age of the precomputed forecast grid",
+               lambda: forecast_grid.stats()["age_seconds"])
+
+async def produce_stream_updates(locations: list) -> dict:
+    """Latest prediction for every streamed location, from the grid where it is fresh"""
+    if not predictor.is_trained:
+        return {}
+    
+    updates = {}
+    for location in locations:
+        response = forecast_grid.get(location)
+        if response is not None:
+            updates[location] = response
+    
+    missing = [location for location in locations if location not in updates]
+    if missing:
+        updates.update(await predict_locations(missing))
+    return {location: response.model_dump() for location, response in updates.items()}
+
+# Server-sent prediction updates: one producer, bounded queue per subscriber
+broadcaster = PredictionBroadcaster(
+    produce_stream_updates,
+    interval=float(os.getenv("STREAM_INTERVAL", "30")),
+    queue_size=int(os.getenv("STREAM_QUEUE_SIZE", "32"))
+)
+STREAM_KEEPALIVE = 15.0
+
+REGISTRY.gauge("power_stream_subscribers", "Connected prediction stream clients",
+               lambda: len(broadcaster.subscriptions))
+REGISTRY.callback_counter("power_stream_dropped_subscribers_total", "Stream clients dropped for falling behind",
+                          lambda: broadcaster.dropped_total)
+
 @app.on_event("startup")
 async def startup_event():
+    global warm_up_task
+    started = time.perf_counter()
+    await weather_service.start()
+    if WEATHER_REFRESH_INTERVAL > 0:
+        weather_service.start_refresher(WEATHER_REFRESH_INTERVAL)
     await database.init_db()
-    await predictor.load_model()
+    if RETENTION_DAYS > 0:
+        database.start_retention(RETENTION_DAYS, RETENTION_INTERVAL)
+    broadcaster.start()
+    startup_state["timings"]["startup_seconds"] = round(time.perf_counter() - started, 3)
+    
+    if STARTUP_MODE == "blocking":
+        await warm_up()
+    else:
+        warm_up_task = asyncio.create_task(warm_up())
+
+async def warm_up():
+    """Load (or train) the model and mark the service ready"""
+    global model_updater
+    started = time.perf_counter()
+    try:
+        await predictor.load_model()
+        startup_state["ready"] = True
+        if FORECAST_GRID_INTERVAL > 0:
+            forecast_grid.start()
+        if MODEL_UPDATE_INTERVAL > 0 or MODEL_RELOAD_INTERVAL > 0:
+            model_updater = asyncio.create_task(model_update_loop())
+    except Exception as e:
+        logging.error(f"Model warm-up failed: {e}")
+        startup_state["error"] = str(e)
+    startup_state["timings"]["model_load_seconds"] = round(time.perf_counter() - started, 3)
+    startup_state["timings"]["ready_after_seconds"] = round(time.perf_counter() - _IMPORT_STARTED, 3)
+
+def ensure_ready():
+    if not predictor.is_trained:
+        raise HTTPException(status_code=503, detail="Model is warming up")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    if warm_up_task is not None and not warm_up_task.done():
+        warm_up_task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await warm_up_task
+    await broadcaster.close()
+    await forecast_grid.close()
+    if model_updater is not None:
+        model_updater.cancel()
+    await weather_service.close()
+    await database.close()
+    predictor.close()
 
 @app.get("/api/states")
 async def get_states():
     """Get list of available states"""
-    states_districts = {
-        "Maharashtra": ["Mumbai", "Pune", "Nagpur", "Nashik", "Aurangabad"],
-        "Karnataka": ["Bangalore", "Mysore", "Hubli", "Mangalore", "Belgaum"],
-        "Tamil Nadu": ["Chennai", "Coimbatore", "Madurai", "Salem", "Tiruchirappalli"],
-        "Gujarat": ["Ahmedabad", "Surat", "Vadodara", "Rajkot", "Gandhinagar"],
-        "Rajasthan": ["Jaipur", "Jodhpur", "Kota", "Bikaner", "Udaipur"],
-        "West Bengal": ["Kolkata", "Howrah", "Durgapur", "Asansol", "Siliguri"],
-        "Uttar Pradesh": ["Lucknow", "Kanpur", "Agra", "Varanasi", "Meerut"],
-        "Haryana": ["Gurgaon", "Faridabad", "Panipat", "Ambala", "Hisar"],
-        "Punjab": ["Ludhiana", "Amritsar", "Jalandhar", "Patiala", "Bathinda"],
-        "Delhi": ["New Delhi", "Central Delhi", "South Delhi", "North Delhi", "East Delhi"]
-    }
-    return states_districts
+    return STATES_DISTRICTS
 
 @app.post("/api/predict", response_model=PredictionResponse)
 async def predict_consumption(request: PredictionRequest):
     """Predict power consumption for given state and district"""
-    try:
-        # Get weather data
-        weather_data = await weather_service.get_weather_data(request.state, request.district)
-        
-        # Get historical context
-        historical_data = await database.get_historical_data(request.state, request.district)
-        
-        # Make prediction
-        prediction_result = await predictor.predict(
-            state=request.state,
-            district=request.district,
-            weather_data=weather_data,
-            historical_data=historical_data
-        )
+    ensure_ready()
+    
+    stage = lambda name: PREDICT_STAGE_SECONDS.time(endpoint="predict", stage=name)
+    
+    # "total" covers answers from the grid as well as computed ones
+    with stage("total"):
+        # Answer from the precomputed grid unless the caller wants fresh data or a longer horizon
+        if not request.fresh and request.horizon_hours == 24:
+            with stage("grid"):
+                response = forecast_grid.get((request.state, request.district))
+            FORECAST_GRID_LOOKUPS.inc(outcome="hit" if response is not None else "miss")
+            if response is not None:
+                return response
         
-        # Get 24-hour predictions
-        predictions_24h = await predictor.predict_24h(
-            state=request.state,
-            district=request.district,
-            weather_data=weather_data
-        )
+        try:
+            # Get weather data
+            with stage("weather"):
+                weather_data = await weather_service.get_weather_data(request.state, request.district)
+            
+            # Get historical context
+            with stage("history"):
+                historical_data = await database.get_historical_data(request.state, request.district)
+            
+            # Make prediction
+            with stage("predict"):
+                prediction_result = await predictor.predict(
+                    state=request.state,
+                    district=request.district,
+                    weather_data=weather_data,
+                    historical_data=historical_data
+                )
+            
+            # Get hourly predictions (24 hours unless a longer horizon is requested)
+            with stage("predict_24h"):
+                predictions_24h = await predictor.predict_24h(
+                    state=request.state,
+                    district=request.district,
+                    weather_data=weather_data,
+                    hours=request.horizon_hours
+                )
+            
+            # Queue prediction for storage (written in batches in the background)
+            with stage("store"):
+                await database.store_prediction(
+                    state=request.state,
+                    district=request.district,
+                    prediction=prediction_result['prediction'],
+                    weather_data=weather_data,
+                    confidence=prediction_result['confidence']
+                )
+            
+            return PredictionResponse(
+                state=request.state,
+                district=request.district,
+                current_prediction=prediction_result['prediction'],
+                confidence_score=prediction_result['confidence'],
+                weather_data=weather_data,
+                parameters=prediction_result['parameters'],
+                predictions_24h=predictions_24h,
+                timestamp=datetime.now().isoformat()
+            )
         
-        # Store prediction in database
-        await database.store_prediction(
-            state=request.state,
-            district=request.district,
-            prediction=prediction_result['prediction'],
-            weather_data=weather_data,
-            confidence=prediction_result['confidence']
-        )
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/predict/batch", response_model=BatchPredictionResponse)
+async def predict_consumption_batch(request: BatchPredictionRequest):
+    """Predict power consumption for many state/district pairs in one pass"""
+    ensure_ready()
+    stage = lambda name: PREDICT_STAGE_SECONDS.time(endpoint="predict_batch", stage=name)
+    try:
+        with stage("total"):
+            predictions = await predict_location_list(
+                [(location.state, location.district) for location in request.locations],
+                hours=request.horizon_hours, stage=stage
+            )
+        return BatchPredictionResponse(predictions=predictions, timestamp=predictions[0].timestamp)
         
-        return PredictionResponse(
-            state=request.state,
-            district=request.district,
-            current_prediction=prediction_result['prediction'],
-            confidence_score=prediction_result['confidence'],
-            weather_data=weather_data,
-            parameters=prediction_result['parameters'],
-            predictions_24h=predictions_24h,
-            timestamp=datetime.now().isoformat()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/actuals/ingest")
+async def ingest_actuals(file: UploadFile = File(...),
+                         file_format: Optional[Literal["csv", "parquet"]] = Query(None, alias="format"),
+                         chunk_rows: int = Query(INGEST_CHUNK_ROWS, ge=1000, le=1000000)):
+    """Bulk load a CSV or Parquet file of actual consumption into historical_data
+    
+    The upload is parsed and committed in chunks of `chunk_rows`; the response
+    counts inserted and rejected rows. See models/ingest.py for the columns. The
+    location index stays in place so live history reads keep using it.
+    """
+    # Imported here so pandas stays out of the startup path
+    from models.ingest import detect_format, ingest, read_chunks
+    
+    chunks = read_chunks(file.file, file_format or detect_format(file.filename or ""), chunk_rows)
+    try:
+        return await ingest(database, chunks, defer_index=False)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        chunks.close()
+        await file.close()
+
+@app.get("/api/history/aggregate")
+async def get_aggregated_history(granularity: Literal["hour", "day"] = "day",
+                                 days: int = Query(30, ge=1, le=3660),
+                                 state: Optional[str] = None, district: Optional[str] = None):
+    """Hourly or daily consumption count/sum/min/max/mean from the rollup tables
+    
+    For one district (`state` and `district`), one state (`state`), or every state.
+    """
+    if district is not None and state is None:
+        raise HTTPException(status_code=422, detail="district requires state")
+    try:
+        rollups = await database.get_rollups(
+            granularity, days, state=state, district=district, states=list(STATES_DISTRICTS)
         )
-        
+        return {"granularity": granularity, "rollups": rollups}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/history/{state}/{district}")
-async def get_history(state: str, district: str, days: int = 7):
-    """Get historical predictions for visualization"""
+async def get_history(state: str, district: str, days: int = 7,
+                      limit: int = Query(1000, ge=1, le=10000), cursor: Optional[str] = None,
+                      bucket: Optional[Literal["hour", "day"]] = None):
+    """Get historical predictions for visualization
+    
+    Newest first, `limit` rows (or hourly/daily buckets) per page; pass the returned
+    `next_cursor` as `cursor` to fetch the next page.
+    """
     try:
-        history = await database.get_prediction_history(state, district, days)
-        return {"history": history}
+        return await database.get_prediction_history(
+            state, district, days, limit=limit, cursor=cursor, bucket=bucket
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/stream")
+async def stream_predictions(request: Request, location: List[str] = Query(..., max_length=500)):
+    """Server-sent prediction updates for the subscribed `location=State:District` pairs
+    
+    Sends the latest known update for each location on connect, then one `prediction`
+    event per location every refresh. A client that falls behind receives a `dropped`
+    event and is disconnected; EventSource reconnects by itself.
+    """
+    locations = set()
+    for value in location:
+        state, _, district = value.partition(":")
+        if not is_known(state, district):
+            raise HTTPException(status_code=422, detail=f"Unknown location: {value}")
+        locations.add((state, district))
+    
+    subscription = broadcaster.subscribe(locations)
+    
+    async def events():
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                try:
+                    update = await asyncio.wait_for(subscription.queue.get(), STREAM_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keepalive\n\n"
+                    continue
+                if subscription.dropped:
+                    yield "event: dropped\ndata: {}\n\n"
+                    break
+                yield f"event: prediction\ndata: {json.dumps(update)}\n\n"
+        finally:
+            broadcaster.unsubscribe(subscription)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/api/ready")
+async def readiness_check():
+    """Readiness for traffic: 200 once the model is loaded, 503 while warming up"""
+    body = {
+        "ready": startup_state["ready"],
+        "error": startup_state["error"],
+        "timings": startup_state["timings"],
+        "timestamp": datetime.now().isoformat()
+    }
+    return JSONResponse(status_code=200 if startup_state["ready"] else 503, content=body)
+
+@app.get("/api/metrics")
+async def metrics():
+    """Stage latencies, upstream, cache, queue and inference metrics for Prometheus"""
+    return Response(content=REGISTRY.render(), media_type=CONTENT_TYPE)
+
 @app.get("/api/health")
 async def health_check():
-    return {"status": "healthy", "timestamp": datetime.now().isoformat()}
+    return {
+        "status": "healthy",
+        "timestamp": datetime.now().isoformat(),
+        "weather_cache": weather_service.cache_stats(),
+        "prediction_cache": predictor.cache_stats(),
+        "forecast_grid": forecast_grid.stats()
+    }
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,127 @@
+import json
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Optional
+from urllib.parse import quote
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock
+    fcntl = None
+
+# Columns archived per prediction; weather fields are NaN where they were NULL
+ARCHIVE_COLUMNS = ('id', 'state', 'district', 'prediction', 'confidence', 'weather_data', 'timestamp',
+                   'temperature', 'humidity', 'wind_speed', 'rainfall')
+FLOAT_COLUMNS = ('prediction', 'confidence', 'temperature', 'humidity', 'wind_speed', 'rainfall')
+
+# Columns history reads need; weather_data, most of a part's bytes, is never loaded for them
+READ_COLUMNS = ('id', 'prediction', 'confidence', 'temperature', 'timestamp')
+
+@lru_cache(maxsize=64)
+def _load_part(path: str, mtime_ns: int) -> Dict[str, np.ndarray]:
+    # `mtime_ns` is part of the cache key so a rewritten part is read again.
+    # An npz decompresses each column only when it is accessed.
+    with np.load(path, allow_pickle=False) as part:
+        return {column: part[column] for column in READ_COLUMNS}
+
+class PredictionArchive:
+    """Compressed columnar archive of old predictions, partitioned by month and location
+
+    Each location's rows for a month live in `<YYYY-MM>/<state>/<district>.npz`, one
+    compressed array per column, sorted by id. Archival batches are merged into the
+    existing part, keeping one row per id, so a batch re-run after a crash between the
+    write and the delete adds nothing. A history read opens one part per month.
+    """
+
+    def __init__(self, directory: str = "data/archive/predictions"):
+        self.directory = Path(directory)
+        self.manifest_path = self.directory / "manifest.json"
+        manifest = json.loads(self.manifest_path.read_text()) if self.manifest_path.exists() else {}
+        # Newest archived timestamp; history reads older than this consult the archive
+        self.latest_timestamp: Optional[str] = manifest.get('latest_timestamp')
+
+    def _part_path(self, month: str, state: str, district: str) -> Path:
+        # Names are quoted so any location maps to one safe file name
+        return self.directory / month / quote(state, safe="") / f"{quote(district, safe='')}.npz"
+
+    def write(self, rows: list) -> int:
+        """Archive prediction rows (tuples in ARCHIVE_COLUMNS order); returns rows written"""
+        if not rows:
+            return 0
+
+        columns = dict(zip(ARCHIVE_COLUMNS, zip(*rows)))
+        arrays = {
+            column: (np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+                     if column in FLOAT_COLUMNS else np.array(values))
+            for column, values in columns.items()
+        }
+        groups = {}
+        for index, (state, district, timestamp) in enumerate(
+                zip(columns['state'], columns['district'], columns['timestamp'])):
+            groups.setdefault((timestamp[:7], state, district), []).append(index)
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # Workers share the archive; parts are read, merged and rewritten under one lock
+        with open(self.directory / ".lock", "w") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            for (month, state, district), indices in groups.items():
+                self._merge(self._part_path(month, state, district),
+                            {column: values[indices] for column, values in arrays.items()})
+
+        latest = max(columns['timestamp'])
+        if self.latest_timestamp is None or latest > self.latest_timestamp:
+            self.latest_timestamp = latest
+            self.manifest_path.write_text(json.dumps({'latest_timestamp': latest}))
+        return len(rows)
+
+    def _merge(self, path: Path, rows: Dict[str, np.ndarray]):
+        if path.exists():
+            with np.load(path, allow_pickle=False) as part:
+                rows = {column: np.concatenate([part[column], values]) for column, values in rows.items()}
+        # Rows archived twice are identical; keep one copy of each id
+        _, first = np.unique(rows['id'], return_index=True)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Write then rename so readers never load a half-written part
+        tmp_path = path.with_name(f"{path.stem}.tmp-{os.getpid()}.npz")
+        np.savez_compressed(tmp_path, **{column: values[first] for column, values in rows.items()})
+        os.replace(tmp_path, path)
+
+    def covers(self, start: str) -> bool:
+        """True when archived rows may be at or after `start`"""
+        return self.latest_timestamp is not None and start <= self.latest_timestamp
+
+    def read(self, state: str, district: str, start: str) -> Dict[str, np.ndarray]:
+        """Archived rows for one location with timestamp >= `start`, as READ_COLUMNS arrays"""
+        parts = []
+        if self.directory.exists():
+            for month_dir in sorted(self.directory.iterdir()):
+                if not month_dir.is_dir() or month_dir.name < start[:7]:
+                    continue
+                path = self._part_path(month_dir.name, state, district)
+                try:
+                    mtime_ns = path.stat().st_mtime_ns
+                except FileNotFoundError:
+                    continue
+                part = _load_part(str(path), mtime_ns)
+                selected = part['timestamp'] >= start
+                if selected.any():
+                    parts.append({column: values[selected] for column, values in part.items()})
+
+        if not parts:
+            return {column: np.array([]) for column in READ_COLUMNS}
+        # An id's month and location fix its part, so parts never share rows
+        return {column: np.concatenate([part[column] for part in parts]) for column in READ_COLUMNS}
+
+    def stats(self) -> dict:
+        files = ([path for path in self.directory.glob("*/*/*.npz") if ".tmp-" not in path.name]
+                 if self.directory.exists() else [])
+        return {
+            'parts': len(files),
+            'bytes': sum(path.stat().st_size for path in files),
+            'latest_timestamp': self.latest_timestamp
+        }
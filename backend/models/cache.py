@@ -0,0 +1,112 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Hashable
+
+class TTLCache:
+    """Bounded in-process cache with TTL expiry, LRU eviction and request coalescing
+
+    Entries younger than `ttl` seconds are fresh. Entries older than `ttl` but younger
+    than `ttl + stale_ttl` are still served while one background task revalidates them.
+    Concurrent misses for the same key wait on a single in-flight load.
+    """
+
+    def __init__(self, ttl: float, max_entries: int = 1024, stale_ttl: float = 0):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (stored_at, value)
+        self._inflight = {}            # key -> asyncio.Task
+        # Bumped by clear(); loads started before a clear do not store their result
+        self._generation = 0
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key: Hashable, default=None):
+        """Return a fresh cached value without loading, or `default`"""
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() - entry[0] < self.ttl:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry[1]
+        self.misses += 1
+        return default
+
+    def set(self, key: Hashable, value):
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        """Drop every entry; loads already in flight still answer their waiters but are not stored"""
+        self._entries.clear()
+        self._inflight.clear()
+        self._generation += 1
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable]):
+        """Return the cached value for `key`, calling `loader()` on a miss
+
+        Loader failures propagate to every waiter and are never cached.
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            age = time.monotonic() - entry[0]
+            if age < self.ttl:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return entry[1]
+            if age < self.ttl + self.stale_ttl:
+                # Serve stale data, revalidate in the background
+                self.stale_hits += 1
+                self._entries.move_to_end(key)
+                self._load(key, loader).add_done_callback(self._log_refresh_failure)
+                return entry[1]
+
+        self.misses += 1
+        # Shield so a cancelled caller does not cancel the load other callers share
+        return await asyncio.shield(self._load(key, loader))
+
+    def _load(self, key: Hashable, loader: Callable[[], Awaitable]) -> asyncio.Task:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._run_loader(key, loader))
+            self._inflight[key] = task
+        return task
+
+    async def _run_loader(self, key: Hashable, loader: Callable[[], Awaitable]):
+        generation = self._generation
+        try:
+            value = await loader()
+            if generation == self._generation:
+                self.set(key, value)
+            return value
+        finally:
+            # After a clear the key may already belong to a newer load
+            if self._inflight.get(key) is asyncio.current_task():
+                del self._inflight[key]
+
+    @staticmethod
+    def _log_refresh_failure(task: asyncio.Task):
+        if not task.cancelled() and task.exception() is not None:
+            logging.warning(f"Background cache refresh failed: {task.exception()}")
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            'size': len(self._entries),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'stale_hits': self.stale_hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_ratio': round((self.hits + self.stale_hits) / lookups, 4) if lookups else 0.0
+        }
@@ -0,0 +1,38 @@
+# States and districts served by the API, in the order shown to clients.
+# The synthetic training data names districts "<State>_District_<N>"; the N-th
+# district listed here is served with that district's encoding.
+STATES_DISTRICTS = {
+    "Maharashtra": ["Mumbai", "Pune", "Nagpur", "Nashik", "Aurangabad"],
+    "Karnataka": ["Bangalore", "Mysore", "Hubli", "Mangalore", "Belgaum"],
+    "Tamil Nadu": ["Chennai", "Coimbatore", "Madurai", "Salem", "Tiruchirappalli"],
+    "Gujarat": ["Ahmedabad", "Surat", "Vadodara", "Rajkot", "Gandhinagar"],
+    "Rajasthan": ["Jaipur", "Jodhpur", "Kota", "Bikaner", "Udaipur"],
+    "West Bengal": ["Kolkata", "Howrah", "Durgapur", "Asansol", "Siliguri"],
+    "Uttar Pradesh": ["Lucknow", "Kanpur", "Agra", "Varanasi", "Meerut"],
+    "Haryana": ["Gurgaon", "Faridabad", "Panipat", "Ambala", "Hisar"],
+    "Punjab": ["Ludhiana", "Amritsar", "Jalandhar", "Patiala", "Bathinda"],
+    "Delhi": ["New Delhi", "Central Delhi", "South Delhi", "North Delhi", "East Delhi"]
+}
+
+# Base consumption by state (MW)
+STATE_BASE_CONSUMPTION = {
+    "Maharashtra": 18000, "Karnataka": 12000, "Tamil Nadu": 14000,
+    "Gujarat": 13000, "Rajasthan": 8000, "West Bengal": 9000,
+    "Uttar Pradesh": 16000, "Haryana": 6000, "Punjab": 7000, "Delhi": 5000
+}
+
+# Industrial load factor by state
+BASE_INDUSTRIAL = {
+    "Maharashtra": 0.85, "Karnataka": 0.75, "Tamil Nadu": 0.80,
+    "Gujarat": 0.90, "Rajasthan": 0.60, "West Bengal": 0.70,
+    "Uttar Pradesh": 0.65, "Haryana": 0.75, "Punjab": 0.70, "Delhi": 0.55
+}
+
+def iter_locations():
+    """Yield every (state, district) pair in catalog order"""
+    for state, districts in STATES_DISTRICTS.items():
+        for district in districts:
+            yield state, district
+
+def is_known(state: str, district: str) -> bool:
+    return district in STATES_DISTRICTS.get(state, ())
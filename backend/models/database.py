@@ -1,94 +1,702 @@
 import sqlite3
 import aiosqlite
 import asyncio
-from datetime import datetime, timedelta
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
 import json
 import logging
 from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from models.archive import PredictionArchive
+
+# Applied to the persistent write connection. With WAL, reads on the separate read
+# connection see the last commit and never wait for a write transaction.
+# auto_vacuum only takes effect on a new file, older files are converted by `compact`.
+PRAGMAS = [
+    "PRAGMA auto_vacuum=INCREMENTAL",
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-65536",      # 64 MB page cache
+    "PRAGMA mmap_size=268435456",    # 256 MB memory-mapped I/O
+    "PRAGMA busy_timeout=5000"
+]
+
+# Applied to the read-only connection that serves history, rollup and actuals reads
+READ_PRAGMAS = [
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA busy_timeout=5000"
+]
+
+# Weather fields stored as typed columns next to the JSON blob
+WEATHER_COLUMNS = ('temperature', 'humidity', 'wind_speed', 'rainfall')
+
+INSERT_PREDICTION = """
+    INSERT INTO predictions (state, district, prediction, confidence, weather_data, timestamp,
+                             temperature, humidity, wind_speed, rainfall)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+INSERT_ACTUAL = """
+    INSERT INTO historical_data (state, district, actual_consumption, weather_data, timestamp)
+    VALUES (?, ?, ?, ?, ?)
+"""
+
+# Rows of a bulk actuals load parsed, validated and committed together
+INGEST_CHUNK_ROWS = 50000
+
+# Composite index for per-location time range queries; dropped during bulk ingest
+CREATE_HISTORICAL_INDEX = """
+    CREATE INDEX IF NOT EXISTS idx_historical_location_time
+    ON historical_data (state, district, timestamp)
+"""
+
+# historical_data keeps weather only in its JSON blob
+ACTUALS_WEATHER = ", ".join(f"json_extract(weather_data, '$.{column}')" for column in WEATHER_COLUMNS)
+
+# Stored timestamps use SQLite's CURRENT_TIMESTAMP format, in UTC
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Bucket start expressions for server-side downsampling of history
+HISTORY_BUCKETS = {
+    'hour': "strftime('%Y-%m-%d %H:00:00', timestamp)",
+    'day': "strftime('%Y-%m-%d 00:00:00', timestamp)"
+}
+
+# Rollup rows with this district hold the whole state
+STATE_ROLLUP = '*'
+
+# Merges a batch's partial aggregate into the stored one
+UPSERT_ROLLUP = """
+    INSERT INTO consumption_rollups (granularity, state, district, bucket_start, count, sum, min, max)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (granularity, state, district, bucket_start) DO UPDATE SET
+        count = count + excluded.count,
+        sum = sum + excluded.sum,
+        min = MIN(min, excluded.min),
+        max = MAX(max, excluded.max)
+"""
+
+# Rows moved to the archive per transaction, and free pages released per incremental vacuum step
+ARCHIVE_BATCH_SIZE = 5000
+VACUUM_PAGES_PER_STEP = 2000
+
+SELECT_EXPIRED = """
+    SELECT id, state, district, prediction, confidence, weather_data, timestamp,
+           temperature, humidity, wind_speed, rainfall
+    FROM predictions
+    WHERE timestamp < ?
+    ORDER BY id
+    LIMIT ?
+"""
+
+def _bucket_start(timestamp: str, granularity: str) -> str:
+    """Bucket start for a stored 'YYYY-MM-DD HH:MM:SS' timestamp, as HISTORY_BUCKETS computes it"""
+    return timestamp[:13] + ":00:00" if granularity == 'hour' else timestamp[:10] + " 00:00:00"
+
+def _rollup_deltas(rows: list) -> list:
+    """Aggregate prediction rows per granularity, district/state and bucket for UPSERT_ROLLUP"""
+    deltas = {}
+    for row in rows:
+        state, district, prediction, timestamp = row[0], row[1], row[2], row[5]
+        for granularity in HISTORY_BUCKETS:
+            bucket = _bucket_start(timestamp, granularity)
+            for key in ((granularity, state, district, bucket), (granularity, state, STATE_ROLLUP, bucket)):
+                delta = deltas.get(key)
+                if delta is None:
+                    deltas[key] = [1, prediction, prediction, prediction]
+                else:
+                    delta[0] += 1
+                    delta[1] += prediction
+                    delta[2] = min(delta[2], prediction)
+                    delta[3] = max(delta[3], prediction)
+    return [key + tuple(delta) for key, delta in deltas.items()]
+
+def _archive_buckets(archived: dict, granularity: str, cursor: Optional[str]) -> dict:
+    """Aggregate archived rows the way `_history_buckets` aggregates live ones"""
+    timestamps = archived['timestamp']
+    keep = timestamps < cursor if cursor else np.ones(len(timestamps), dtype=bool)
+    if not keep.any():
+        return {}
+    
+    # Truncating the 'YYYY-MM-DD HH:MM:SS' strings gives the bucket prefix
+    prefix = timestamps[keep].astype('U13' if granularity == 'hour' else 'U10')
+    keys, inverse = np.unique(prefix, return_inverse=True)
+    prediction = archived['prediction'][keep]
+    confidence = archived['confidence'][keep]
+    temperature = archived['temperature'][keep]
+    has_temperature = ~np.isnan(temperature)
+    
+    low = np.full(len(keys), np.inf)
+    high = np.full(len(keys), -np.inf)
+    np.minimum.at(low, inverse, prediction)
+    np.maximum.at(high, inverse, prediction)
+    columns = zip(
+        np.bincount(inverse), np.bincount(inverse, prediction), low, high,
+        np.bincount(inverse, confidence),
+        np.bincount(inverse, np.where(has_temperature, temperature, 0.0)),
+        np.bincount(inverse, has_temperature)
+    )
+    suffix = ":00:00" if granularity == 'hour' else " 00:00:00"
+    return {
+        f"{key}{suffix}": [int(c), float(t), float(lo), float(hi), float(conf), float(temp), int(n)]
+        for key, (c, t, lo, hi, conf, temp, n) in zip(keys, columns)
+    }
 
 class Database:
-    def __init__(self):
-        self.db_path = "data/predictions.db"
-        Path("data").mkdir(exist_ok=True)
+    def __init__(self, db_path: str = "data/predictions.db", batch_size: int = 500,
+                 flush_interval: float = 1.0, queue_size: int = 10000,
+                 archive_dir: str = "data/archive/predictions"):
+        self.db_path = db_path
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._db: Optional[aiosqlite.Connection] = None
+        # Reads get their own connection and worker thread, so they do not queue
+        # behind batch inserts, index rebuilds or vacuum steps on the writer
+        self._reader: Optional[aiosqlite.Connection] = None
+        self._write_lock: Optional[asyncio.Lock] = None
+        
+        # Write-behind queue: predictions are flushed in batches by a background task
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue_size = queue_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._writer: Optional[asyncio.Task] = None
+        
+        # Predictions older than the retention window move to monthly archive files
+        self.archive = PredictionArchive(archive_dir)
+        self._retention: Optional[asyncio.Task] = None
     
     async def init_db(self):
-        """Initialize database tables"""
-        async with aiosqlite.connect(self.db_path) as db:
-            # Predictions table
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS predictions (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    state TEXT NOT NULL,
-                    district TEXT NOT NULL,
-                    prediction REAL NOT NULL,
-                    confidence REAL NOT NULL,
-                    weather_data TEXT NOT NULL,
-                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            
-            # Historical data table
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS historical_data (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    state TEXT NOT NULL,
-                    district TEXT NOT NULL,
-                    actual_consumption REAL NOT NULL,
-                    weather_data TEXT NOT NULL,
-                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            
-            await db.commit()
-            logging.info("Database initialized successfully")
+        """Open the persistent connections and initialize database tables"""
+        if self._db is None:
+            # Created here so they bind to the running event loop
+            self._write_lock = asyncio.Lock()
+            self._queue = asyncio.Queue(maxsize=self.queue_size)
+            self._db = await aiosqlite.connect(self.db_path)
+            for pragma in PRAGMAS:
+                await self._db.execute(pragma)
+        
+        db = self._db
+        
+        # Predictions table
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS predictions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                state TEXT NOT NULL,
+                district TEXT NOT NULL,
+                prediction REAL NOT NULL,
+                confidence REAL NOT NULL,
+                weather_data TEXT NOT NULL,
+                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+                temperature REAL,
+                humidity REAL,
+                wind_speed REAL,
+                rainfall REAL
+            )
+        """)
+        await self._migrate_weather_columns(db)
+        
+        # Per hour/day consumption aggregates per district and per state (district = '*'),
+        # kept current by the writer in the same transaction as the raw rows
+        cursor = await db.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'consumption_rollups'"
+        )
+        rollups_exist = await cursor.fetchone() is not None
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS consumption_rollups (
+                granularity TEXT NOT NULL,
+                state TEXT NOT NULL,
+                district TEXT NOT NULL,
+                bucket_start TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                sum REAL NOT NULL,
+                min REAL NOT NULL,
+                max REAL NOT NULL,
+                PRIMARY KEY (granularity, state, district, bucket_start)
+            ) WITHOUT ROWID
+        """)
+        if not rollups_exist:
+            await self._rebuild_rollups(db)
+        
+        # Historical data table
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS historical_data (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                state TEXT NOT NULL,
+                district TEXT NOT NULL,
+                actual_consumption REAL NOT NULL,
+                weather_data TEXT NOT NULL,
+                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        
+        # Covering index for history: range scans and keyset pages never touch the table.
+        # It starts with the old (state, district, timestamp) index, which is dropped.
+        await db.execute("""
+            CREATE INDEX IF NOT EXISTS idx_predictions_history
+            ON predictions (state, district, timestamp, id, prediction, confidence, temperature)
+        """)
+        await db.execute("DROP INDEX IF EXISTS idx_predictions_location_time")
+        
+        await db.execute(CREATE_HISTORICAL_INDEX)
+        
+        await db.commit()
+        
+        if self._reader is None:
+            # Opened once the file and its WAL mode exist
+            self._reader = await aiosqlite.connect(f"{Path(self.db_path).resolve().as_uri()}?mode=ro", uri=True)
+            for pragma in READ_PRAGMAS:
+                await self._reader.execute(pragma)
+        
+        if self._writer is None:
+            self._writer = asyncio.create_task(self._writer_loop())
+        logging.info("Database initialized successfully")
+    
+    async def _migrate_weather_columns(self, db: aiosqlite.Connection):
+        """Add the typed weather columns to an older predictions table and backfill them"""
+        cursor = await db.execute("PRAGMA table_info(predictions)")
+        existing = {row[1] for row in await cursor.fetchall()}
+        missing = [column for column in WEATHER_COLUMNS if column not in existing]
+        if not missing:
+            return
+        
+        for column in missing:
+            await db.execute(f"ALTER TABLE predictions ADD COLUMN {column} REAL")
+        await db.execute(
+            "UPDATE predictions SET "
+            + ", ".join(f"{column} = json_extract(weather_data, '$.{column}')" for column in missing)
+        )
+        logging.info(f"Backfilled prediction weather columns: {', '.join(missing)}")
+    
+    async def _rebuild_rollups(self, db: aiosqlite.Connection):
+        """Recompute every rollup from the raw predictions (first start after upgrading)"""
+        await db.execute("DELETE FROM consumption_rollups")
+        for granularity, bucket in HISTORY_BUCKETS.items():
+            for district in ("district", f"'{STATE_ROLLUP}'"):
+                await db.execute(f"""
+                    INSERT INTO consumption_rollups
+                    SELECT '{granularity}', state, {district}, {bucket},
+                           COUNT(*), SUM(prediction), MIN(prediction), MAX(prediction)
+                    FROM predictions
+                    GROUP BY state, {district}, {bucket}
+                """)
+    
+    async def close(self):
+        """Flush queued predictions, stop the writer and close the persistent connections"""
+        if self._retention is not None:
+            self._retention.cancel()
+            self._retention = None
+        if self._writer is not None:
+            await self.flush()
+            self._writer.cancel()
+            self._writer = None
+        if self._reader is not None:
+            await self._reader.close()
+            self._reader = None
+        if self._db is not None:
+            await self._db.close()
+            self._db = None
+    
+    async def _connection(self) -> aiosqlite.Connection:
+        if self._db is None:
+            await self.init_db()
+        return self._db
+    
+    async def _read_connection(self) -> aiosqlite.Connection:
+        if self._reader is None:
+            await self.init_db()
+        return self._reader
     
     async def store_prediction(self, state: str, district: str, prediction: float, 
                              weather_data: dict, confidence: float):
-        """Store prediction in database"""
+        """Queue a prediction for storage
+        
+        Returns once the row is queued; waits only if the queue is full (backpressure).
+        """
+        await self._enqueue(self._prediction_row(state, district, prediction, weather_data, confidence))
+    
+    async def store_predictions(self, records: list):
+        """Queue many predictions for storage
+        
+        `records` is a list of dicts with the same keys as `store_prediction` arguments.
+        """
+        for r in records:
+            await self._enqueue(self._prediction_row(
+                r['state'], r['district'], r['prediction'], r['weather_data'], r['confidence']
+            ))
+    
+    async def flush(self):
+        """Wait until every queued prediction has been written"""
+        if self._writer is not None:
+            await self._queue.join()
+    
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+    
+    def _prediction_row(self, state: str, district: str, prediction: float,
+                        weather_data: dict, confidence: float, timestamp: Optional[datetime] = None):
+        # Capture the request time now; same format as SQLite CURRENT_TIMESTAMP (UTC)
+        timestamp = (timestamp or datetime.now(timezone.utc)).strftime(TIMESTAMP_FORMAT)
+        return (state, district, prediction, confidence, json.dumps(weather_data), timestamp,
+                *(weather_data.get(column) for column in WEATHER_COLUMNS))
+    
+    async def _enqueue(self, row: tuple):
+        if self._writer is None:
+            await self.init_db()
+        await self._queue.put(row)
+    
+    async def _writer_loop(self):
+        """Flush queued rows when a batch fills up or `flush_interval` elapses"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.flush_interval
+            
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                    continue
+                except asyncio.QueueEmpty:
+                    pass
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            
+            try:
+                await self._write_batch(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+    
+    async def _write_batch(self, rows: list):
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                await db.execute("""
-                    INSERT INTO predictions (state, district, prediction, confidence, weather_data)
-                    VALUES (?, ?, ?, ?, ?)
-                """, (state, district, prediction, confidence, json.dumps(weather_data)))
+            db = await self._connection()
+            async with self._write_lock:
+                await db.executemany(INSERT_PREDICTION, rows)
+                await db.executemany(UPSERT_ROLLUP, _rollup_deltas(rows))
                 await db.commit()
         except Exception as e:
-            logging.error(f"Error storing prediction: {e}")
+            logging.error(f"Error storing {len(rows)} predictions: {e}")
     
-    async def get_prediction_history(self, state: str, district: str, days: int = 7):
-        """Get historical predictions for visualization"""
+    async def insert_actuals(self, rows: list):
+        """Insert actual consumption rows (tuples in INSERT_ACTUAL order) in one transaction"""
+        db = await self._connection()
+        async with self._write_lock:
+            await db.executemany(INSERT_ACTUAL, rows)
+            await db.commit()
+    
+    @asynccontextmanager
+    async def deferred_actuals_index(self):
+        """Drop the historical_data index for a bulk load and rebuild it once afterwards
+        
+        Building the index in one sorted pass is much cheaper than updating it per
+        row. Actuals reads scan the table until the rebuild finishes.
+        """
+        db = await self._connection()
+        async with self._write_lock:
+            await db.execute("DROP INDEX IF EXISTS idx_historical_location_time")
+            await db.commit()
         try:
-            start_date = datetime.now() - timedelta(days=days)
+            yield
+        finally:
+            started = asyncio.get_running_loop().time()
+            async with self._write_lock:
+                await db.execute(CREATE_HISTORICAL_INDEX)
+                await db.commit()
+            logging.info(f"Rebuilt historical data index in {asyncio.get_running_loop().time() - started:.2f}s")
+    
+    def start_retention(self, retention_days: float, interval: float):
+        """Archive predictions older than `retention_days` every `interval` seconds"""
+        if self._retention is None:
+            self._retention = asyncio.create_task(self._retention_loop(retention_days, interval))
+    
+    async def _retention_loop(self, retention_days: float, interval: float):
+        while True:
+            try:
+                archived = await self.archive_expired(retention_days)
+                if archived:
+                    await self.compact()
+            except Exception as e:
+                logging.error(f"Prediction retention error: {e}")
+            await asyncio.sleep(interval)
+    
+    async def archive_expired(self, retention_days: float, batch_size: int = ARCHIVE_BATCH_SIZE) -> int:
+        """Move predictions older than `retention_days` into the archive
+        
+        Works in batches of `batch_size` rows: each batch is written to its monthly
+        archive part, then deleted in its own short transaction, so the writer only
+        ever waits for one batch. Rollups are kept; they already include these rows.
+        """
+        cutoff = (datetime.now(timezone.utc) - timedelta(days=retention_days)).strftime(TIMESTAMP_FORMAT)
+        db = await self._connection()
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        archived = 0
+        
+        while True:
+            rows = await db.execute_fetchall(SELECT_EXPIRED, (cutoff, batch_size))
+            if not rows:
+                break
             
-            async with aiosqlite.connect(self.db_path) as db:
-                cursor = await db.execute("""
-                    SELECT prediction, confidence, weather_data, timestamp
-                    FROM predictions
-                    WHERE state = ? AND district = ? AND timestamp >= ?
-                    ORDER BY timestamp DESC
-                    LIMIT 100
-                """, (state, district, start_date.isoformat()))
-                
-                rows = await cursor.fetchall()
-                
-                history = []
-                for row in rows:
-                    weather_data = json.loads(row[2])
-                    history.append({
-                        'prediction': row[0],
-                        'confidence': row[1],
-                        'temperature': weather_data.get('temperature', 0),
-                        'timestamp': row[3]
-                    })
-                
-                return history
+            # Archive first: a crash before the delete rewrites the same part next time
+            await loop.run_in_executor(None, self.archive.write, rows)
+            async with self._write_lock:
+                await db.executemany("DELETE FROM predictions WHERE id = ?", [(row[0],) for row in rows])
+                await db.commit()
+            archived += len(rows)
+            
+            if len(rows) < batch_size:
+                break
+            await asyncio.sleep(0)  # let queued writes and reads in between batches
+        
+        if archived:
+            logging.info(f"Archived {archived} predictions older than {cutoff} "
+                         f"in {loop.time() - started:.2f}s")
+        return archived
+    
+    async def compact(self, pages_per_step: int = VACUUM_PAGES_PER_STEP):
+        """Return free pages to the filesystem a few at a time"""
+        db = await self._connection()
+        cursor = await db.execute("PRAGMA auto_vacuum")
+        if (await cursor.fetchone())[0] != 2:
+            # One-off conversion of a file created before auto_vacuum=INCREMENTAL
+            async with self._write_lock:
+                await db.execute("PRAGMA auto_vacuum=INCREMENTAL")
+                await db.execute("VACUUM")
+            logging.info("Converted predictions database to incremental auto-vacuum")
+            return
+        
+        while True:
+            cursor = await db.execute("PRAGMA freelist_count")
+            if (await cursor.fetchone())[0] == 0:
+                break
+            async with self._write_lock:
+                await db.execute_fetchall(f"PRAGMA incremental_vacuum({pages_per_step})")
+            await asyncio.sleep(0)
+    
+    async def get_prediction_history(self, state: str, district: str, days: int = 7,
+                                     limit: int = 1000, cursor: Optional[str] = None,
+                                     bucket: Optional[str] = None):
+        """Get historical predictions for visualization, newest first
+        
+        With `bucket` ('hour' or 'day') rows are averaged per bucket in SQL. Returns
+        `{'history': [...], 'next_cursor': ...}`; pass `next_cursor` back as `cursor`
+        for the next page, it is None on the last page. Ranges reaching past the
+        retention window are merged with the archive.
+        """
+        if bucket is not None and bucket not in HISTORY_BUCKETS:
+            raise ValueError(f"Unknown history bucket: {bucket}")
+        
+        try:
+            start_date = (datetime.now(timezone.utc) - timedelta(days=days)).strftime(TIMESTAMP_FORMAT)
+            db = await self._read_connection()
+            
+            archived = None
+            if self.archive.covers(start_date):
+                loop = asyncio.get_running_loop()
+                archived = await loop.run_in_executor(None, self.archive.read, state, district, start_date)
+            
+            if bucket is None:
+                history = await self._history_rows(db, state, district, start_date, limit, cursor, archived)
+            else:
+                history = await self._history_buckets(
+                    db, state, district, start_date, limit, cursor, bucket, archived
+                )
+            
+            next_cursor = None
+            if len(history) > limit:
+                history = history[:limit]
+                next_cursor = history[-1].pop('_cursor')
+            for row in history:
+                row.pop('_cursor', None)
+            
+            return {'history': history, 'next_cursor': next_cursor}
                 
         except Exception as e:
             logging.error(f"Error fetching history: {e}")
+            return {'history': [], 'next_cursor': None}
+    
+    async def _history_rows(self, db, state: str, district: str, start_date: str,
+                            limit: int, cursor: Optional[str], archived: Optional[dict]):
+        # Keyset pagination on (timestamp, id); served entirely from idx_predictions_history
+        params = [state, district, start_date]
+        after = ""
+        if cursor:
+            timestamp, row_id = cursor.rsplit("|", 1)
+            after = "AND (timestamp, id) < (?, ?)"
+            params += [timestamp, int(row_id)]
+        
+        rows = await db.execute_fetchall(f"""
+            SELECT id, prediction, confidence, temperature, timestamp
+            FROM predictions
+            WHERE state = ? AND district = ? AND timestamp >= ? {after}
+            ORDER BY timestamp DESC, id DESC
+            LIMIT ?
+        """, (*params, limit + 1))
+        
+        if archived is not None and len(archived['id']):
+            live_ids = {row[0] for row in rows}
+            archived_rows = [
+                (int(row_id), float(prediction), float(confidence),
+                 None if np.isnan(temperature) else float(temperature), str(timestamp))
+                for row_id, prediction, confidence, temperature, timestamp in zip(
+                    archived['id'], archived['prediction'], archived['confidence'],
+                    archived['temperature'], archived['timestamp']
+                )
+                if int(row_id) not in live_ids
+                and (not cursor or (str(timestamp), int(row_id)) < (params[3], params[4]))
+            ]
+            rows = sorted(list(rows) + archived_rows, key=lambda row: (row[4], row[0]), reverse=True)[:limit + 1]
+        
+        return [
+            {
+                'prediction': row[1],
+                'confidence': row[2],
+                'temperature': row[3] if row[3] is not None else 0,
+                'timestamp': row[4],
+                '_cursor': f"{row[4]}|{row[0]}"
+            }
+            for row in rows
+        ]
+    
+    async def _history_buckets(self, db, state: str, district: str, start_date: str,
+                               limit: int, cursor: Optional[str], bucket: str,
+                               archived: Optional[dict]):
+        # Buckets are aligned, so everything before a bucket's start lies in older buckets
+        params = [state, district, start_date]
+        before = ""
+        if cursor:
+            before = "AND timestamp < ?"
+            params.append(cursor)
+        
+        # Sums rather than averages so buckets straddling the archive boundary can be merged
+        rows = await db.execute_fetchall(f"""
+            SELECT {HISTORY_BUCKETS[bucket]} AS bucket_start,
+                   COUNT(*), SUM(prediction), MIN(prediction), MAX(prediction),
+                   SUM(confidence), SUM(temperature), COUNT(temperature)
+            FROM predictions
+            WHERE state = ? AND district = ? AND timestamp >= ? {before}
+            GROUP BY bucket_start
+            ORDER BY bucket_start DESC
+            LIMIT ?
+        """, (*params, limit + 1))
+        buckets = {row[0]: list(row[1:]) for row in rows}
+        
+        if archived is not None and len(archived['id']):
+            for key, partial in _archive_buckets(archived, bucket, cursor).items():
+                merged = buckets.get(key)
+                if merged is None:
+                    buckets[key] = partial
+                else:
+                    buckets[key] = [
+                        merged[0] + partial[0], merged[1] + partial[1],
+                        min(merged[2], partial[2]), max(merged[3], partial[3]),
+                        merged[4] + partial[4], (merged[5] or 0) + partial[5], merged[6] + partial[6]
+                    ]
+        
+        return [
+            {
+                'prediction': round(total / count, 2),
+                'prediction_min': low,
+                'prediction_max': high,
+                'confidence': round(confidence / count, 3),
+                'temperature': round(temperature / n_temperature, 2) if n_temperature else 0,
+                'samples': count,
+                'timestamp': key,
+                '_cursor': key
+            }
+            for key, (count, total, low, high, confidence, temperature, n_temperature)
+            in sorted(buckets.items(), reverse=True)[:limit + 1]
+        ]
+    
+    async def get_rollups(self, granularity: str, days: int = 30, state: Optional[str] = None,
+                          district: Optional[str] = None, states: Optional[list] = None):
+        """Hourly or daily consumption aggregates, oldest first
+        
+        With `district` the series is for that district, otherwise it covers the whole
+        state. Without `state`, one state-level series is returned for each of `states`.
+        """
+        if granularity not in HISTORY_BUCKETS:
+            raise ValueError(f"Unknown rollup granularity: {granularity}")
+        
+        start = _bucket_start(
+            (datetime.now(timezone.utc) - timedelta(days=days)).strftime(TIMESTAMP_FORMAT), granularity
+        )
+        selected = [state] if state is not None else list(states or [])
+        if not selected:
+            return []
+        
+        db = await self._read_connection()
+        rows = await db.execute_fetchall(f"""
+            SELECT state, district, bucket_start, count, sum, min, max
+            FROM consumption_rollups
+            WHERE granularity = ? AND state IN ({", ".join("?" * len(selected))})
+              AND district = ? AND bucket_start >= ?
+            ORDER BY state, bucket_start
+        """, (granularity, *selected, district if district is not None else STATE_ROLLUP, start))
+        
+        return [
+            {
+                'state': row[0],
+                'district': row[1] if row[1] != STATE_ROLLUP else None,
+                'timestamp': row[2],
+                'count': row[3],
+                'sum': round(row[4], 2),
+                'min': row[5],
+                'max': row[6],
+                'mean': round(row[4] / row[3], 2)
+            }
+            for row in rows
+        ]
+    
+    async def get_historical_data(self, state: str, district: str, days: int = 7, limit: int = 168):
+        """Recent actual consumption for a location, newest first"""
+        try:
+            start_date = (datetime.now(timezone.utc) - timedelta(days=days)).strftime(TIMESTAMP_FORMAT)
+            db = await self._read_connection()
+            rows = await db.execute_fetchall(f"""
+                SELECT actual_consumption, {ACTUALS_WEATHER}, timestamp
+                FROM historical_data
+                WHERE state = ? AND district = ? AND timestamp >= ?
+                ORDER BY timestamp DESC
+                LIMIT ?
+            """, (state, district, start_date, limit))
+            
+            return [
+                {'actual_consumption': row[0], **dict(zip(WEATHER_COLUMNS, row[1:5])), 'timestamp': row[5]}
+                for row in rows
+            ]
+        
+        except Exception as e:
+            logging.error(f"Error fetching historical data: {e}")
             return []
     
-    async def get_historical_data(self, state: str, district: str):
-        """Get historical consumption data for context"""
-        # For now, return simulated historical data
-        # In production, this would fetch actual historical consumption data
-        return []
\ No newline at end of file
+    async def get_actuals(self, after_id: int = 0, limit: int = 100000, latest: bool = False):
+        """Actuals for model updates, as dicts with `id`, location, weather and `timestamp`
+        
+        By default rows with id above `after_id` in id order, so each update reads only
+        what arrived since the last one. With `latest`, the newest `limit` rows instead.
+        """
+        where, order = ("", "DESC") if latest else ("WHERE id > ?", "ASC")
+        params = () if latest else (after_id,)
+        
+        db = await self._read_connection()
+        rows = await db.execute_fetchall(f"""
+            SELECT id, state, district, actual_consumption, {ACTUALS_WEATHER}, timestamp
+            FROM historical_data
+            {where}
+            ORDER BY id {order}
+            LIMIT ?
+        """, (*params, limit))
+        
+        columns = ('id', 'state', 'district', 'actual_consumption') + WEATHER_COLUMNS + ('timestamp',)
+        return [dict(zip(columns, row)) for row in rows]
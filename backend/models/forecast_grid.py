@@ -0,0 +1,67 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+class ForecastGrid:
+    """Precomputed predictions for a fixed set of locations, refreshed on a schedule
+
+    `compute(locations)` returns a dict of location -> value for the whole set in one
+    call. The grid is swapped in atomically after each refresh, so readers always see
+    one consistent generation. `get` is a dict lookup plus an age check.
+    """
+
+    def __init__(self, compute: Callable[[List[Hashable]], Awaitable[Dict[Hashable, object]]],
+                 locations: List[Hashable], interval: float = 300, max_age: float = 900):
+        self.compute = compute
+        self.locations = list(locations)
+        self.interval = interval
+        self.max_age = max_age
+        self.grid: Dict[Hashable, Tuple[float, object]] = {}  # location -> (generated_at, value)
+        self.generated_at: Optional[float] = None
+        self.last_duration: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Refresh now and then every `interval` seconds"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logging.error(f"Forecast grid refresh error: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def refresh(self) -> int:
+        """Recompute every location and swap the new generation in"""
+        started = time.monotonic()
+        values = await self.compute(self.locations)
+        generated_at = time.monotonic()
+        self.grid = {location: (generated_at, value) for location, value in values.items()}
+        self.generated_at = generated_at
+        self.last_duration = generated_at - started
+        logging.info(f"Forecast grid refreshed for {len(values)} locations in {self.last_duration:.2f}s")
+        return len(values)
+
+    def get(self, location: Hashable, max_age: Optional[float] = None):
+        """The precomputed value if it is younger than `max_age` seconds, else None"""
+        entry = self.grid.get(location)
+        if entry is None or time.monotonic() - entry[0] > (self.max_age if max_age is None else max_age):
+            return None
+        return entry[1]
+
+    def stats(self) -> dict:
+        return {
+            'locations': len(self.grid),
+            'age_seconds': (round(time.monotonic() - self.generated_at, 1)
+                            if self.generated_at is not None else None),
+            'last_refresh_seconds': round(self.last_duration, 3) if self.last_duration is not None else None
+        }
@@ -0,0 +1,210 @@
+"""Bulk load of actual consumption into `historical_data`
+
+Files are read in chunks, so memory stays flat however large the input is. Each
+chunk is validated against the catalog and inserted in one transaction. The
+command line drops the location index and rebuilds it once at the end; uploads to
+a running server keep it, since live history reads depend on it.
+
+    cd backend
+    python -m models.ingest data/actuals.csv
+    python -m models.ingest data/actuals.parquet --chunk-rows 200000
+
+Columns: `state`, `district`, `actual_consumption` and `timestamp`, plus optional
+weather readings (`temperature`, `humidity`, `wind_speed`, `rainfall`) or a JSON
+`weather_data` column. Rows for unknown locations, with an unparseable
+timestamp or consumption, or whose `weather_data` is not a JSON object are
+skipped and counted.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+import time
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from models.catalog import iter_locations
+from models.database import Database, INGEST_CHUNK_ROWS, WEATHER_COLUMNS
+
+REQUIRED_COLUMNS = ('state', 'district', 'actual_consumption', 'timestamp')
+INPUT_COLUMNS = REQUIRED_COLUMNS + WEATHER_COLUMNS + ('weather_data',)
+
+# Catalog locations for a vectorized membership test
+KNOWN_LOCATIONS = pd.MultiIndex.from_tuples(list(iter_locations()))
+
+# Reported unknown locations are capped so a bad file does not flood the summary
+MAX_UNKNOWN_REPORTED = 20
+
+def detect_format(filename: str) -> str:
+    return "parquet" if filename.lower().endswith((".parquet", ".pq")) else "csv"
+
+def read_chunks(source, file_format: str = "csv", chunk_rows: int = INGEST_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """Yield DataFrames of at most `chunk_rows` rows from a path or binary file object"""
+    if file_format == "csv":
+        yield from pd.read_csv(source, chunksize=chunk_rows, usecols=lambda c: c in INPUT_COLUMNS,
+                               dtype={'state': str, 'district': str, 'weather_data': str})
+    elif file_format == "parquet":
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ValueError("Parquet ingest requires pyarrow (pip install pyarrow)")
+        parquet = pq.ParquetFile(source)
+        columns = [c for c in parquet.schema_arrow.names if c in INPUT_COLUMNS]
+        for batch in parquet.iter_batches(batch_size=chunk_rows, columns=columns):
+            yield batch.to_pandas()
+    else:
+        raise ValueError(f"Unsupported file format: {file_format}")
+
+def prepare_chunk(frame: pd.DataFrame) -> Tuple[list, pd.DataFrame]:
+    """Rows ready for Database.insert_actuals, and the rejected part of the chunk"""
+    missing = [column for column in REQUIRED_COLUMNS if column not in frame.columns]
+    if missing:
+        raise ValueError(f"Missing required columns: {', '.join(missing)}")
+
+    state = frame['state'].astype(str).str.strip()
+    district = frame['district'].astype(str).str.strip()
+    consumption = pd.to_numeric(frame['actual_consumption'], errors='coerce')
+    # Naive timestamps are taken as UTC, like SQLite CURRENT_TIMESTAMP
+    timestamps = pd.to_datetime(frame['timestamp'], errors='coerce', utc=True)
+
+    known = pd.Series(pd.MultiIndex.from_arrays([state, district]).isin(KNOWN_LOCATIONS), index=frame.index)
+    valid = known & consumption.notna() & timestamps.notna()
+
+    if 'weather_data' in frame.columns:
+        weather = frame['weather_data'].map(_weather_object)
+        valid &= weather.notna()
+        weather = weather[valid].tolist()
+    else:
+        weather = _weather_json(frame.loc[valid], [c for c in WEATHER_COLUMNS if c in frame.columns])
+
+    # datetime_as_string is vectorized; strftime formats row by row
+    seconds = timestamps[valid].dt.tz_localize(None).to_numpy().astype('datetime64[s]')
+    stamps = np.char.replace(np.datetime_as_string(seconds), "T", " ").tolist()
+
+    rows = list(zip(
+        state[valid].tolist(), district[valid].tolist(), consumption[valid].astype(float).tolist(),
+        weather, stamps
+    ))
+    rejected = pd.DataFrame({'state': state[~valid], 'district': district[~valid], 'known': known[~valid]})
+    return rows, rejected
+
+def _weather_object(text) -> Optional[str]:
+    """`text` if it is a JSON object SQLite's JSON functions can read, "{}" if missing, else None
+
+    One malformed value makes every json_extract over the table fail, so bad rows
+    are rejected here rather than stored.
+    """
+    if not isinstance(text, str):
+        return "{}"
+    try:
+        # NaN and Infinity are accepted by Python but not by SQLite
+        value = json.loads(text, parse_constant=_reject_constant)
+    except ValueError:
+        return None
+    return text if isinstance(value, dict) else None
+
+def _reject_constant(name: str):
+    raise ValueError(f"{name} is not valid JSON")
+
+def _weather_json(frame: pd.DataFrame, columns: list) -> list:
+    """The weather_data JSON for each row, omitting missing readings"""
+    readings = frame[columns].apply(pd.to_numeric, errors='coerce').to_numpy(float)
+    complete = np.isfinite(readings).all(axis=1)
+    # A float's repr is its JSON form, so complete rows skip json.dumps
+    template = "{" + ", ".join(f'"{column}": %r' for column in columns) + "}"
+    return [
+        template % tuple(row) if ok
+        else json.dumps({column: value for column, value in zip(columns, row) if math.isfinite(value)})
+        for row, ok in zip(readings.tolist(), complete.tolist())
+    ]
+
+async def ingest(database: Database, chunks: Iterator[pd.DataFrame], defer_index: bool = False,
+                 progress_interval: float = 5.0) -> dict:
+    """Load every chunk into `historical_data`; returns a summary of the run
+
+    Parsing and validation run in the default executor so an upload does not hold
+    up the event loop. The next chunk is parsed while the current one is inserted.
+    `defer_index` rebuilds the location index once at the end instead; only for
+    offline loads, as every history read scans the table until then.
+    """
+    loop = asyncio.get_running_loop()
+    started = last_report = time.perf_counter()
+    inserted = rejected = 0
+    unknown = set()
+
+    def next_chunk():
+        frame = next(chunks, None)
+        return None if frame is None else prepare_chunk(frame)
+
+    async def load():
+        nonlocal inserted, rejected, last_report
+        pending = loop.run_in_executor(None, next_chunk)
+        while True:
+            prepared = await pending
+            if prepared is None:
+                break
+            pending = loop.run_in_executor(None, next_chunk)
+            rows, rejected_rows = prepared
+            if rows:
+                await database.insert_actuals(rows)
+            inserted += len(rows)
+            rejected += len(rejected_rows)
+            if len(unknown) < MAX_UNKNOWN_REPORTED:
+                unknown_rows = rejected_rows[~rejected_rows['known']]
+                unknown.update(zip(unknown_rows['state'], unknown_rows['district']))
+
+            now = time.perf_counter()
+            if now - last_report >= progress_interval:
+                logging.info(f"Ingested {inserted} actuals ({inserted / (now - started):.0f} rows/s), "
+                             f"rejected {rejected}")
+                last_report = now
+
+    if defer_index:
+        async with database.deferred_actuals_index():
+            await load()
+    else:
+        await load()
+
+    elapsed = time.perf_counter() - started
+    summary = {
+        'inserted': inserted,
+        'rejected': rejected,
+        'unknown_locations': [f"{state}:{district}" for state, district in sorted(unknown)[:MAX_UNKNOWN_REPORTED]],
+        'seconds': round(elapsed, 3),
+        'rows_per_second': round(inserted / elapsed) if elapsed > 0 else None
+    }
+    logging.info(f"Ingest finished: {summary}")
+    return summary
+
+async def _ingest_file(path: str, file_format: str, chunk_rows: int, db_path: str, defer_index: bool) -> dict:
+    database = Database(db_path)
+    await database.init_db()
+    try:
+        return await ingest(database, read_chunks(path, file_format, chunk_rows), defer_index=defer_index)
+    finally:
+        await database.close()
+
+def main(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(description="Bulk load actual consumption into historical_data")
+    parser.add_argument("path", help="CSV or Parquet file")
+    parser.add_argument("--format", choices=["csv", "parquet"], help="input format (default: from the extension)")
+    parser.add_argument("--chunk-rows", type=int, default=INGEST_CHUNK_ROWS,
+                        help=f"rows parsed and committed per transaction (default {INGEST_CHUNK_ROWS})")
+    parser.add_argument("--db", default=os.getenv("DATABASE_URL", "data/predictions.db"),
+                        help="SQLite database path (default: DATABASE_URL or data/predictions.db)")
+    parser.add_argument("--keep-index", action="store_true",
+                        help="maintain the location index during the load instead of rebuilding it")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    summary = asyncio.run(_ingest_file(
+        args.path, args.format or detect_format(args.path), args.chunk_rows, args.db, not args.keep_index
+    ))
+    print(json.dumps(summary, indent=2))
+
+if __name__ == "__main__":
+    main()
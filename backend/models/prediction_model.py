@@ -1,37 +1,400 @@
-import pandas as pd
+# pandas and sklearn are imported where they are used (training, unpickling) so that
+# importing this module stays cheap and the API can start serving health checks fast
 import numpy as np
-from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
-from sklearn.preprocessing import StandardScaler, LabelEncoder
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import mean_absolute_error, r2_score
 import joblib
 import asyncio
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 from datetime import datetime, timedelta
 import logging
 from pathlib import Path
+from typing import Optional
+import os
+import shutil
+import sys
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock
+    fcntl = None
+
+try:
+    import resource
+except ImportError:  # Windows: no peak memory in training reports
+    resource = None
+
+from models.cache import TTLCache
+from models.catalog import BASE_INDUSTRIAL, STATE_BASE_CONSUMPTION, STATES_DISTRICTS
+from models.metrics import INFERENCE_CALLS, INFERENCE_ROWS
+from models.tree_engine import TreeEnsembleEngine
+
+# Season code indexed by month (1-12), see `_get_season`
+SEASON_BY_MONTH = np.array([0, 4, 4, 1, 1, 1, 2, 2, 2, 2, 3, 3, 4])
+SEASON_NAMES = ['', 'Summer', 'Monsoon', 'Post-monsoon', 'Winter']
+
+def _build_time_features():
+    """Calendar features for every (hour, weekday, month), month indexed 1-12
+    
+    Columns: hour, day_of_week, month, is_peak_hour, is_weekend, season and the
+    industrial load multiplier (0.7 on weekends, 0.6 at night).
+    """
+    hour, day_of_week, month = np.meshgrid(np.arange(24), np.arange(7), np.arange(13), indexing='ij')
+    is_peak_hour = ((6 <= hour) & (hour <= 9)) | ((18 <= hour) & (hour <= 22))
+    is_weekend = day_of_week >= 5
+    is_night = (hour >= 22) | (hour <= 6)
+    industrial_multiplier = np.where(is_weekend, 0.7, 1.0) * np.where(is_night, 0.6, 1.0)
+    return np.stack([
+        hour, day_of_week, month, is_peak_hour, is_weekend, SEASON_BY_MONTH[month], industrial_multiplier
+    ], axis=-1).astype(float)
+
+TIME_FEATURES = _build_time_features()
+
+FEATURE_COLUMNS = [
+    'state_encoded', 'district_encoded', 'hour', 'day_of_week', 'month',
+    'temperature', 'humidity', 'wind_speed', 'rainfall', 'industrial_load',
+    'temp_squared', 'humidity_temp', 'is_peak_hour', 'is_weekend', 'season'
+]
+
+# From this many training rows "auto" boosting uses HistGradientBoostingRegressor,
+# whose binned splits stay fast where classic gradient boosting slows to hours
+HIST_BOOSTING_MIN_ROWS = 100000
+
+# Above this many rows the sklearn models are faster than the flat-array engine
+COMPILED_ENGINE_MAX_ROWS = 1024
+
+# Std-dev of simulated hourly weather drift: temperature, humidity, wind speed, rainfall
+WEATHER_NOISE_STD = np.array([2.0, 5.0, 3.0, 1.0])
+
+MODEL_PATH = Path("models/trained_model.joblib")
+
+# Memory-mappable layout: engine node arrays as .npy files plus the small preprocessing state
+MAPPED_MODEL_PATH = Path("models/trained_model_arrays")
+MODEL_LOCK_PATH = Path("models/trained_model.lock")
+
+def acquire_model_lock():
+    """Block until this process holds the cross-process model lock"""
+    MODEL_LOCK_PATH.parent.mkdir(exist_ok=True)
+    lock_file = open(MODEL_LOCK_PATH, "w")
+    if fcntl is not None:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+    return lock_file
+
+def release_model_lock(lock_file):
+    if fcntl is not None:
+        fcntl.flock(lock_file, fcntl.LOCK_UN)
+    lock_file.close()
+
+@contextmanager
+def training_stage(stages: dict, name: str, memory: bool = True):
+    """Record the wall time and peak resident memory of a training stage
+
+    The peak is process-wide, so stages that run concurrently pass `memory=False`
+    and the stage enclosing them reports their combined figure.
+    """
+    started = time.perf_counter()
+    peak_before = _peak_rss_mb() if memory else None
+    try:
+        yield
+    finally:
+        stages[name] = {'seconds': round(time.perf_counter() - started, 3)}
+        if memory:
+            peak = _peak_rss_mb()
+            stages[name]['peak_rss_mb'] = peak
+            stages[name]['peak_rss_growth_mb'] = round(peak - peak_before, 1) if peak is not None else None
+
+def _peak_rss_mb() -> Optional[float]:
+    """High-water mark of this process's resident memory"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)  # bytes on macOS, KB elsewhere
+
+def _train_in_subprocess(n_training_samples: int):
+    """Train a fresh predictor in a worker process and return its artifact"""
+    # The serving process compiles the engine when it applies the artifact
+    predictor = PowerConsumptionPredictor(n_training_samples=n_training_samples, compiled_inference=False)
+    report = predictor.train_sync()
+    logging.info(f"Model trained: {report}")
+    return predictor.model.artifact()
+
+def _update_in_subprocess(X_new, y_new, ids_new, X_window, y_window,
+                          rf_add_trees: int, rf_max_trees: int):
+    """Update the saved ensemble with actuals in a worker process
+    
+    The random forest is warm-started with `rf_add_trees` trees fit on the new rows
+    only, keeping the newest `rf_max_trees`. Gradient boosting is refit on the recent
+    window. Raw feature rows are scaled with the existing scaler, which stays fixed
+    so the forest's older trees remain valid.
+    
+    Rows at or below the saved model's watermark were already learned by another
+    worker and are skipped; with none left the saved model is returned unchanged.
+    Returns `(artifact, rows fit, model version)`.
+    """
+    from sklearn.base import clone
+    
+    lock = acquire_model_lock()
+    try:
+        artifact = joblib.load(MODEL_PATH)
+        scaler = artifact['scaler']
+        stored_watermark = artifact.get('actuals_watermark', 0)
+        
+        fresh = ids_new > stored_watermark if X_new is not None else np.zeros(0, dtype=bool)
+        if not fresh.any():
+            return artifact, 0, MODEL_PATH.stat().st_mtime_ns
+        
+        rf_model = artifact['rf_model']
+        rf_model.set_params(warm_start=True, n_estimators=len(rf_model.estimators_) + rf_add_trees)
+        rf_model.fit(scaler.transform(X_new[fresh]), y_new[fresh])
+        if len(rf_model.estimators_) > rf_max_trees:
+            rf_model.estimators_ = rf_model.estimators_[-rf_max_trees:]
+            rf_model.n_estimators = rf_max_trees
+        rf_model.set_params(warm_start=False)
+        
+        if X_window is not None:
+            artifact['gb_model'] = clone(artifact['gb_model']).fit(scaler.transform(X_window), y_window)
+        
+        artifact['actuals_watermark'] = int(ids_new[fresh].max())
+        
+        # Write then rename so a concurrent load never reads a partial file
+        tmp_path = MODEL_PATH.with_name(f"{MODEL_PATH.name}.tmp-{os.getpid()}")
+        joblib.dump(artifact, tmp_path)
+        os.replace(tmp_path, MODEL_PATH)
+        return artifact, int(fresh.sum()), MODEL_PATH.stat().st_mtime_ns
+    finally:
+        release_model_lock(lock)
+
+class ServingModel:
+    """Everything inference reads for one model version
+    
+    Built completely, engine included, before it is installed with a single
+    assignment to `PowerConsumptionPredictor.model`. Each request takes that
+    reference once, so it never mixes encodings or trees from two versions.
+    """
+    
+    def __init__(self, rf_model, gb_model, scaler, label_encoders: dict, feature_names: list,
+                 actuals_watermark: int = 0, engine: Optional[TreeEnsembleEngine] = None):
+        # sklearn members; None when only the mapped engine is served
+        self.rf_model = rf_model
+        self.gb_model = gb_model
+        self.scaler = scaler
+        self.label_encoders = label_encoders
+        self.feature_names = feature_names
+        
+        # Id of the newest historical_data row the model has learned from
+        self.actuals_watermark = actuals_watermark
+        
+        # Flat-array evaluator used instead of sklearn predict once it passes a parity check
+        self.engine = engine
+        
+        # (state, district) -> (state code, district code, base industrial load)
+        self.feature_index = self._build_feature_index()
+    
+    @classmethod
+    def from_artifact(cls, model_data: dict) -> "ServingModel":
+        return cls(
+            model_data['rf_model'], model_data['gb_model'], model_data['scaler'],
+            model_data['label_encoders'], model_data['feature_names'],
+            model_data.get('actuals_watermark', 0)
+        )
+    
+    def artifact(self) -> dict:
+        return {
+            'rf_model': self.rf_model,
+            'gb_model': self.gb_model,
+            'scaler': self.scaler,
+            'label_encoders': self.label_encoders,
+            'feature_names': self.feature_names,
+            'actuals_watermark': self.actuals_watermark
+        }
+    
+    def score(self, features: np.ndarray):
+        """Score a raw feature matrix with both ensemble members"""
+        # sklearn's compiled traversal wins on large batches when the models are loaded
+        if self.engine is not None and (len(features) <= COMPILED_ENGINE_MAX_ROWS or self.rf_model is None):
+            INFERENCE_CALLS.inc(backend="engine")
+            INFERENCE_ROWS.inc(len(features), backend="engine")
+            return self.engine.predict(features)
+        INFERENCE_CALLS.inc(backend="sklearn")
+        INFERENCE_ROWS.inc(len(features), backend="sklearn")
+        features_scaled = self.scaler.transform(features)
+        return self.rf_model.predict(features_scaled), self.gb_model.predict(features_scaled)
+    
+    def _build_feature_index(self) -> dict:
+        """Precompute encodings and base industrial load for every catalog location"""
+        state_codes = self.class_codes('state')
+        district_codes = self.class_codes('district')
+        
+        index = {}
+        for state, districts in STATES_DISTRICTS.items():
+            for position, district in enumerate(districts, start=1):
+                # Prefer the real district name; models trained on synthetic data
+                # only know "<State>_District_<N>"
+                district_code = district_codes.get(
+                    district, district_codes.get(f"{state}_District_{position}", 0)
+                )
+                index[(state, district)] = (
+                    state_codes.get(state, 0), district_code, BASE_INDUSTRIAL.get(state, 0.70)
+                )
+        return index
+    
+    def class_codes(self, column: str) -> dict:
+        encoder = self.label_encoders.get(column)
+        if encoder is None:
+            return {}
+        return {name: code for code, name in enumerate(encoder.classes_)}
+    
+    def location_features(self, state: str, district: str):
+        """(state code, district code, base industrial load) for a location"""
+        features = self.feature_index.get((state, district))
+        if features is None:
+            # Locations outside the catalog fall back to per-call encoding
+            features = (
+                self.encode_categorical('state', state),
+                self.encode_categorical('district', district),
+                BASE_INDUSTRIAL.get(state, 0.70)
+            )
+        return features
+    
+    def encode_categorical(self, column: str, value: str):
+        """Encode categorical variable"""
+        if column not in self.label_encoders:
+            return 0
+        
+        try:
+            return self.label_encoders[column].transform([value])[0]
+        except:
+            # Return most common class if unseen value
+            return 0
 
 class PowerConsumptionPredictor:
-    def __init__(self):
-        self.rf_model = None
-        self.gb_model = None
-        self.scaler = StandardScaler()
-        self.label_encoders = {}
-        self.is_trained = False
-        self.feature_names = []
+    def __init__(self, n_training_samples: int = 10000, inference_workers: int = 4,
+                 training_workers: int = 1, compiled_inference: bool = True,
+                 model_load_mode: str = "joblib", prediction_cache_ttl: float = 900,
+                 prediction_cache_size: int = 4096):
+        self.n_training_samples = n_training_samples
+        
+        # The served model version, replaced as a whole; None until one is loaded
+        self.model: Optional[ServingModel] = None
+        
+        # Modification time of the stored model this process serves, to notice
+        # when another worker replaces it
+        self.model_version: Optional[int] = None
+        
+        # Compile a flat-array engine for each model version it serves
+        self.compiled_inference = compiled_inference
+        
+        # "joblib": every process unpickles its own sklearn models
+        # "mmap": processes map one shared copy of the engine node arrays
+        self.model_load_mode = model_load_mode
+        
+        # Results keyed by location, hour bucket and weather; 0 entries disables the cache
+        self.prediction_cache = (
+            TTLCache(ttl=prediction_cache_ttl, max_entries=prediction_cache_size)
+            if prediction_cache_size > 0 else None
+        )
+        
+        # sklearn work runs off the event loop: inference in threads, training in processes
+        self.inference_workers = inference_workers
+        self.training_workers = training_workers
+        self._inference_executor: Optional[ThreadPoolExecutor] = None
+        self._training_executor: Optional[ProcessPoolExecutor] = None
+    
+    @property
+    def is_trained(self) -> bool:
+        return self.model is not None
+    
+    @property
+    def actuals_watermark(self) -> int:
+        """Id of the newest historical_data row the served model has learned from"""
+        return self.model.actuals_watermark if self.model is not None else 0
+    
+    def _inference_pool(self) -> ThreadPoolExecutor:
+        if self._inference_executor is None:
+            self._inference_executor = ThreadPoolExecutor(
+                max_workers=self.inference_workers, thread_name_prefix="inference"
+            )
+        return self._inference_executor
+    
+    def _training_pool(self) -> ProcessPoolExecutor:
+        if self._training_executor is None:
+            self._training_executor = ProcessPoolExecutor(
+                max_workers=self.training_workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._training_executor
+    
+    async def _run_inference(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._inference_pool(), func, *args)
+    
+    def close(self):
+        """Shut down the worker pools"""
+        for executor in (self._inference_executor, self._training_executor):
+            if executor is not None:
+                executor.shutdown(wait=False)
+        self._inference_executor = None
+        self._training_executor = None
         
     async def load_model(self):
-        """Load pre-trained model or train new one"""
-        model_path = Path("models/trained_model.joblib")
+        """Load pre-trained model or train new one
+        
+        Holds a cross-process file lock, so when several workers start together
+        only one trains and the rest wait and then load its result.
+        """
+        lock = await self._run_inference(acquire_model_lock)
+        try:
+            if self.model_load_mode == "mmap":
+                await self._load_mapped_model()
+            else:
+                await self._load_joblib_model()
+            self.model_version = self._stored_version()
+        finally:
+            release_model_lock(lock)
+    
+    def _stored_version(self) -> Optional[int]:
+        path = MAPPED_MODEL_PATH / "preprocessing.joblib" if self.model_load_mode == "mmap" else MODEL_PATH
+        try:
+            return path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+    
+    async def reload_if_updated(self) -> bool:
+        """Load the stored model if another process replaced it since this one loaded
+        
+        Every worker updates the same stored model, so the others pick up the
+        result here instead of serving their old model or refitting the same rows.
+        """
+        if not self.is_trained or self._stored_version() in (None, self.model_version):
+            return False
+        
+        lock = await self._run_inference(acquire_model_lock)
+        try:
+            version = self._stored_version()
+            if self.model_load_mode == "mmap":
+                await self._install(self._apply_mapped)
+            else:
+                model_data = await self._run_inference(joblib.load, MODEL_PATH)
+                await self._install(self._apply_artifact, model_data)
+            self.model_version = version
+        finally:
+            release_model_lock(lock)
+        logging.info(f"Reloaded model replaced by another process (actuals watermark {self.actuals_watermark})")
+        return True
+    
+    async def _install(self, apply, *args):
+        """Build and swap in a model off the event loop, then drop cached predictions
         
-        if model_path.exists():
+        The prediction cache is not thread-safe, so it is only cleared here on the loop.
+        """
+        await self._run_inference(apply, *args)
+        self._clear_prediction_cache()
+    
+    async def _load_joblib_model(self):
+        if MODEL_PATH.exists():
             try:
-                model_data = joblib.load(model_path)
-                self.rf_model = model_data['rf_model']
-                self.gb_model = model_data['gb_model']
-                self.scaler = model_data['scaler']
-                self.label_encoders = model_data['label_encoders']
-                self.feature_names = model_data['feature_names']
-                self.is_trained = True
+                model_data = await self._run_inference(joblib.load, MODEL_PATH)
+                await self._install(self._apply_artifact, model_data)
                 logging.info("Model loaded successfully")
             except Exception as e:
                 logging.warning(f"Could not load model: {e}")
@@ -39,185 +402,380 @@ class PowerConsumptionPredictor:
         else:
             await self.train_model()
     
+    async def _load_mapped_model(self):
+        if not MAPPED_MODEL_PATH.exists():
+            await self._load_joblib_model()
+            if self.model.engine is None:
+                logging.warning("Compiled engine unavailable, serving joblib models instead of mmap")
+                return
+            await self._run_inference(self._export_mapped)
+        
+        await self._install(self._apply_mapped)
+        logging.info(f"Model mapped from {MAPPED_MODEL_PATH}")
+    
+    def _export_mapped(self):
+        """Write the engine arrays and preprocessing state, swapping the directory in atomically
+        
+        Callers hold the model lock, so no other worker maps the directory mid-swap.
+        """
+        model = self.model
+        tmp_path = MAPPED_MODEL_PATH.with_name(f"{MAPPED_MODEL_PATH.name}.tmp-{os.getpid()}")
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        model.engine.save(tmp_path)
+        joblib.dump({
+            'scaler': model.scaler,
+            'label_encoders': model.label_encoders,
+            'feature_names': model.feature_names,
+            'actuals_watermark': model.actuals_watermark
+        }, tmp_path / "preprocessing.joblib")
+        
+        old_path = MAPPED_MODEL_PATH.with_name(f"{MAPPED_MODEL_PATH.name}.old-{os.getpid()}")
+        if MAPPED_MODEL_PATH.exists():
+            MAPPED_MODEL_PATH.rename(old_path)
+        tmp_path.rename(MAPPED_MODEL_PATH)
+        shutil.rmtree(old_path, ignore_errors=True)
+    
+    def _apply_mapped(self):
+        preprocessing = joblib.load(MAPPED_MODEL_PATH / "preprocessing.joblib")
+        # No private sklearn copies; only the shared mapping stays resident
+        self.model = ServingModel(
+            None, None, preprocessing['scaler'], preprocessing['label_encoders'],
+            preprocessing['feature_names'], preprocessing.get('actuals_watermark', 0),
+            engine=TreeEnsembleEngine.load(MAPPED_MODEL_PATH, mmap_mode='r')
+        )
+    
+    def _clear_prediction_cache(self):
+        if self.prediction_cache is not None:
+            self.prediction_cache.clear()
+    
     async def train_model(self):
-        """Train the prediction model"""
+        """Train the prediction model in a worker process"""
         try:
-            # Generate synthetic training data
-            data = self._generate_synthetic_data()
-            
-            # Prepare features
-            X, y = self._prepare_features(data)
+            loop = asyncio.get_running_loop()
+            model_data = await loop.run_in_executor(
+                self._training_pool(), _train_in_subprocess, self.n_training_samples
+            )
+            await self._install(self._apply_artifact, model_data)
+            logging.info("Model training completed successfully")
             
-            # Split data
+        except Exception as e:
+            logging.error(f"Error training model: {e}")
+            raise
+    
+    async def update_model(self, new_actuals: list, window_actuals: list,
+                           rf_add_trees: int = 10, rf_max_trees: int = 300) -> dict:
+        """Learn from ingested actuals in a worker process without pausing inference
+        
+        `new_actuals` are the rows since `actuals_watermark` (from Database.get_actuals)
+        and grow the forest; `window_actuals` are the most recent rows and replace the
+        boosting model, or may be empty to keep it. Serving continues on the current
+        model until the updated one is swapped in. If another worker already learned
+        these rows, its stored model is swapped in instead.
+        """
+        X_new, y_new, ids_new = await self._run_inference(self._actuals_matrix, new_actuals)
+        X_window, y_window, _ = await self._run_inference(self._actuals_matrix, window_actuals)
+        
+        loop = asyncio.get_running_loop()
+        model_data, fitted_rows, version = await loop.run_in_executor(
+            self._training_pool(), _update_in_subprocess,
+            X_new, y_new, ids_new, X_window, y_window, rf_add_trees, rf_max_trees
+        )
+        
+        # Compiling and checking the new engine runs off the event loop as well
+        await self._install(self._apply_artifact, model_data)
+        self.model_version = version
+        if self.model_load_mode == "mmap" and self.model.engine is not None:
+            await self._publish_mapped()
+        
+        model = self.model
+        summary = {
+            'new_rows': fitted_rows,
+            'window_rows': len(window_actuals) if X_window is not None and fitted_rows else 0,
+            'rf_trees': model.engine.n_rf_trees if model.engine is not None else len(model.rf_model.estimators_),
+            'actuals_watermark': model.actuals_watermark
+        }
+        logging.info(f"Model updated from actuals: {summary}")
+        return summary
+    
+    async def _publish_mapped(self):
+        """Export the applied model for mmap workers under the model lock and map it
+        
+        Skipped when another worker already exported a model at least as new.
+        """
+        lock = await self._run_inference(acquire_model_lock)
+        try:
+            preprocessing_path = MAPPED_MODEL_PATH / "preprocessing.joblib"
+            mapped = await self._run_inference(joblib.load, preprocessing_path) if preprocessing_path.exists() else {}
+            if mapped.get('actuals_watermark', -1) < self.actuals_watermark:
+                await self._run_inference(self._export_mapped)
+            await self._install(self._apply_mapped)
+            self.model_version = self._stored_version()
+        finally:
+            release_model_lock(lock)
+    
+    def _actuals_matrix(self, actuals: list):
+        """Raw feature rows, targets and row ids for actuals, or Nones when there are none"""
+        if not actuals:
+            return None, None, None
+        
+        model = self.model
+        by_location = {}
+        for row in actuals:
+            by_location.setdefault((row['state'], row['district']), []).append(row)
+        
+        blocks, targets, ids = [], [], []
+        for (state, district), rows in by_location.items():
+            times = [datetime.strptime(row['timestamp'][:19], "%Y-%m-%d %H:%M:%S") for row in rows]
+            # Weather defaults match WeatherService when a reading is missing
+            weather = {
+                column: np.array([row[column] if row[column] is not None else default for row in rows], dtype=float)
+                for column, default in (('temperature', 25), ('humidity', 60), ('wind_speed', 10), ('rainfall', 0))
+            }
+            # Expected industrial load for the hour, without the serving-time noise
+            industrial_load = self._expected_industrial_load(model, state, district, times)
+            blocks.append(self._build_features(
+                model, state, district, times, weather['temperature'], weather['humidity'],
+                weather['wind_speed'], weather['rainfall'], industrial_load
+            ))
+            targets.extend(row['actual_consumption'] for row in rows)
+            ids.extend(row['id'] for row in rows)
+        
+        return np.vstack(blocks), np.asarray(targets, dtype=float), np.asarray(ids, dtype=np.int64)
+    
+    def train_sync(self, data=None, boosting: str = "auto", n_jobs: int = -1) -> dict:
+        """Fit both ensemble members, save the artifact and serve it; returns per-stage timings
+        
+        Runs in the calling thread; callers training a stored model other processes
+        may read hold the model lock. The flat-array engine is compiled for the new
+        model when `compiled_inference` is set.
+        
+        `data` has the columns of `_generate_synthetic_data` (the sample dataset CSV
+        does too) and defaults to `n_training_samples` synthetic rows. The forest is
+        built on `n_jobs` cores while the boosting model is fit alongside it in a
+        thread; sklearn's tree builders release the GIL. `boosting` is "gb",
+        "hist" (histogram-based, for large datasets) or "auto" to pick by size.
+        """
+        from sklearn.ensemble import (RandomForestRegressor, GradientBoostingRegressor,
+                                      HistGradientBoostingRegressor)
+        from sklearn.model_selection import train_test_split
+        from sklearn.metrics import mean_absolute_error
+        
+        stages = {}
+        
+        with training_stage(stages, "data"):
+            if data is None:
+                data = self._generate_synthetic_data()
+        
+        with training_stage(stages, "features"):
+            X, y, label_encoders, scaler = self._prepare_features(data)
             X_train, X_test, y_train, y_test = train_test_split(
                 X, y, test_size=0.2, random_state=42
             )
-            
-            # Train models
-            self.rf_model = RandomForestRegressor(
-                n_estimators=100, 
+        
+        if boosting == "auto":
+            boosting = "hist" if len(X_train) >= HIST_BOOSTING_MIN_ROWS else "gb"
+        
+        # Train models
+        rf_model = RandomForestRegressor(
+            n_estimators=100, 
+            random_state=42,
+            max_depth=10,
+            min_samples_split=5,
+            n_jobs=n_jobs
+        )
+        if boosting == "hist":
+            gb_model = HistGradientBoostingRegressor(
+                max_iter=100,
                 random_state=42,
-                max_depth=10,
-                min_samples_split=5
+                max_depth=6,
+                learning_rate=0.1
             )
-            self.gb_model = GradientBoostingRegressor(
+        else:
+            gb_model = GradientBoostingRegressor(
                 n_estimators=100,
                 random_state=42,
                 max_depth=6,
                 learning_rate=0.1
             )
-            
-            self.rf_model.fit(X_train, y_train)
-            self.gb_model.fit(X_train, y_train)
-            
-            # Evaluate models
-            rf_pred = self.rf_model.predict(X_test)
-            gb_pred = self.gb_model.predict(X_test)
-            
-            rf_mae = mean_absolute_error(y_test, rf_pred)
-            gb_mae = mean_absolute_error(y_test, gb_pred)
-            
-            logging.info(f"Random Forest MAE: {rf_mae:.2f}")
-            logging.info(f"Gradient Boosting MAE: {gb_mae:.2f}")
-            
-            # Save model
-            Path("models").mkdir(exist_ok=True)
-            joblib.dump({
-                'rf_model': self.rf_model,
-                'gb_model': self.gb_model,
-                'scaler': self.scaler,
-                'label_encoders': self.label_encoders,
-                'feature_names': self.feature_names
-            }, "models/trained_model.joblib")
-            
-            self.is_trained = True
-            logging.info("Model training completed successfully")
-            
+        
+        # The fits overlap, so only "fit" reports their peak memory
+        def fit(name, model):
+            with training_stage(stages, name, memory=False):
+                model.fit(X_train, y_train)
+        
+        with training_stage(stages, "fit"), ThreadPoolExecutor(max_workers=1, thread_name_prefix="boosting") as pool:
+            boosting_fit = pool.submit(fit, f"fit_{boosting}", gb_model)
+            fit("fit_rf", rf_model)
+            boosting_fit.result()
+        
+        # Evaluate models
+        with training_stage(stages, "evaluate"):
+            rf_mae = mean_absolute_error(y_test, rf_model.predict(X_test))
+            gb_mae = mean_absolute_error(y_test, gb_model.predict(X_test))
+        
+        logging.info(f"Random Forest MAE: {rf_mae:.2f}")
+        logging.info(f"Gradient Boosting ({boosting}) MAE: {gb_mae:.2f}")
+        
+        # Save model; write then rename so a concurrent load never reads a partial file
+        model = ServingModel(rf_model, gb_model, scaler, label_encoders, FEATURE_COLUMNS)
+        with training_stage(stages, "save"):
+            MODEL_PATH.parent.mkdir(exist_ok=True)
+            tmp_path = MODEL_PATH.with_name(f"{MODEL_PATH.name}.tmp-{os.getpid()}")
+            joblib.dump(model.artifact(), tmp_path)
+            os.replace(tmp_path, MODEL_PATH)
+        
+        if self.compiled_inference:
+            with training_stage(stages, "compile"):
+                model.engine = self._compile_engine(model)
+        self.model = model
+        return {
+            'rows': len(X),
+            'boosting': boosting,
+            'rf_mae': round(float(rf_mae), 2),
+            'gb_mae': round(float(gb_mae), 2),
+            'stages': stages
+        }
+    
+    def _apply_artifact(self, model_data: dict):
+        """Build the serving model for an artifact, engine included, then swap it in"""
+        model = ServingModel.from_artifact(model_data)
+        if self.compiled_inference:
+            model.engine = self._compile_engine(model)
+        self.model = model
+    
+    def _compile_engine(self, model: ServingModel) -> Optional[TreeEnsembleEngine]:
+        """Export the ensemble to flat arrays, keeping it only if it matches sklearn"""
+        try:
+            engine = TreeEnsembleEngine.from_models(model.rf_model, model.gb_model, model.scaler)
+            if engine.check_parity(model.rf_model, model.gb_model, model.scaler, self._parity_rows(model)):
+                return engine
         except Exception as e:
-            logging.error(f"Error training model: {e}")
-            raise
+            logging.warning(f"Could not compile ensemble: {e}")
+        return None
     
-    def _generate_synthetic_data(self):
-        """Generate synthetic training data based on Indian power consumption patterns"""
-        np.random.seed(42)
-        n_samples = 10000
+    def _generate_synthetic_data(self, n_samples: int = None, seed: int = 42):
+        """Generate synthetic training data based on Indian power consumption patterns
         
-        states = ["Maharashtra", "Karnataka", "Tamil Nadu", "Gujarat", "Rajasthan", 
-                 "West Bengal", "Uttar Pradesh", "Haryana", "Punjab", "Delhi"]
+        Every variable is drawn once for all `n_samples` rows and the seasonal,
+        time-of-day and AC adjustments are applied with array masks.
+        """
+        import pandas as pd
+        
+        rng = np.random.default_rng(seed)
+        n_samples = n_samples or self.n_training_samples
+        
+        states = np.array(list(STATE_BASE_CONSUMPTION))
         districts_per_state = 5
         
-        data = []
+        state = rng.choice(states, n_samples)
+        district_idx = rng.integers(0, districts_per_state, n_samples)
         
-        for i in range(n_samples):
-            state = np.random.choice(states)
-            district_idx = np.random.randint(0, districts_per_state)
-            
-            # Base consumption by state (MW)
-            state_base = {
-                "Maharashtra": 18000, "Karnataka": 12000, "Tamil Nadu": 14000,
-                "Gujarat": 13000, "Rajasthan": 8000, "West Bengal": 9000,
-                "Uttar Pradesh": 16000, "Haryana": 6000, "Punjab": 7000, "Delhi": 5000
-            }
-            
-            base_consumption = state_base[state]
-            
-            # Time factors
-            hour = np.random.randint(0, 24)
-            day_of_week = np.random.randint(0, 7)
-            month = np.random.randint(1, 13)
-            
-            # Weather parameters
-            temperature = np.random.normal(28, 8)  # Celsius
-            humidity = np.random.uniform(30, 90)   # %
-            wind_speed = np.random.uniform(2, 20)  # km/h
-            rainfall = np.random.exponential(2)     # mm
-            
-            # Seasonal adjustments
-            if month in [4, 5, 6]:  # Summer
-                temperature += np.random.normal(8, 2)
-                base_consumption *= np.random.uniform(1.3, 1.6)
-            elif month in [12, 1, 2]:  # Winter
-                temperature -= np.random.normal(5, 2)
-                base_consumption *= np.random.uniform(0.8, 1.1)
-            elif month in [7, 8, 9]:  # Monsoon
-                rainfall += np.random.exponential(5)
-                humidity += np.random.normal(10, 5)
-                base_consumption *= np.random.uniform(0.9, 1.2)
-            
-            # Time of day effects
-            if 6 <= hour <= 9 or 18 <= hour <= 22:  # Peak hours
-                time_factor = np.random.uniform(1.4, 1.8)
-            elif 22 <= hour <= 24 or 0 <= hour <= 6:  # Night
-                time_factor = np.random.uniform(0.6, 0.8)
-            else:  # Day
-                time_factor = np.random.uniform(1.0, 1.3)
-            
-            # Industrial/commercial factors
-            industrial_load = np.random.uniform(0.7, 1.3)
-            if day_of_week >= 5:  # Weekend
-                industrial_load *= 0.7
-            
-            # Temperature effect on AC usage
-            if temperature > 30:
-                ac_factor = 1 + (temperature - 30) * 0.05
-            elif temperature < 15:
-                heating_factor = 1 + (15 - temperature) * 0.03
-                ac_factor = heating_factor
-            else:
-                ac_factor = 1.0
-            
-            # Calculate final consumption
-            consumption = (base_consumption * time_factor * industrial_load * 
-                         ac_factor * np.random.uniform(0.9, 1.1))
-            
-            data.append({
-                'state': state,
-                'district': f"{state}_District_{district_idx + 1}",
-                'hour': hour,
-                'day_of_week': day_of_week,
-                'month': month,
-                'temperature': round(temperature, 2),
-                'humidity': round(humidity, 2),
-                'wind_speed': round(wind_speed, 2),
-                'rainfall': round(rainfall, 2),
-                'industrial_load': round(industrial_load, 3),
-                'power_consumption_mw': round(consumption, 2)
-            })
-        
-        return pd.DataFrame(data)
+        # Base consumption by state (MW)
+        base_consumption = pd.Series(state).map(STATE_BASE_CONSUMPTION).to_numpy(dtype=float)
+        
+        # Time factors
+        hour = rng.integers(0, 24, n_samples)
+        day_of_week = rng.integers(0, 7, n_samples)
+        month = rng.integers(1, 13, n_samples)
+        
+        # Weather parameters
+        temperature = rng.normal(28, 8, n_samples)  # Celsius
+        humidity = rng.uniform(30, 90, n_samples)   # %
+        wind_speed = rng.uniform(2, 20, n_samples)  # km/h
+        rainfall = rng.exponential(2, n_samples)    # mm
+        
+        # Seasonal adjustments
+        summer = np.isin(month, [4, 5, 6])
+        winter = np.isin(month, [12, 1, 2])
+        monsoon = np.isin(month, [7, 8, 9])
+        
+        temperature[summer] += rng.normal(8, 2, summer.sum())
+        base_consumption[summer] *= rng.uniform(1.3, 1.6, summer.sum())
+        
+        temperature[winter] -= rng.normal(5, 2, winter.sum())
+        base_consumption[winter] *= rng.uniform(0.8, 1.1, winter.sum())
+        
+        rainfall[monsoon] += rng.exponential(5, monsoon.sum())
+        humidity[monsoon] += rng.normal(10, 5, monsoon.sum())
+        base_consumption[monsoon] *= rng.uniform(0.9, 1.2, monsoon.sum())
+        
+        # Time of day effects: peak hours, night, day
+        is_peak = ((6 <= hour) & (hour <= 9)) | ((18 <= hour) & (hour <= 22))
+        is_night = ~is_peak & ((hour >= 22) | (hour <= 6))
+        time_factor = rng.uniform(
+            np.select([is_peak, is_night], [1.4, 0.6], 1.0),
+            np.select([is_peak, is_night], [1.8, 0.8], 1.3)
+        )
+        
+        # Industrial/commercial factors
+        industrial_load = rng.uniform(0.7, 1.3, n_samples)
+        industrial_load[day_of_week >= 5] *= 0.7  # Weekend
+        
+        # Temperature effect on AC usage (heating below 15C)
+        ac_factor = np.where(
+            temperature > 30, 1 + (temperature - 30) * 0.05,
+            np.where(temperature < 15, 1 + (15 - temperature) * 0.03, 1.0)
+        )
+        
+        # Calculate final consumption
+        consumption = (base_consumption * time_factor * industrial_load * 
+                       ac_factor * rng.uniform(0.9, 1.1, n_samples))
+        
+        return pd.DataFrame({
+            'state': state,
+            'district': pd.Series(state) + "_District_" + pd.Series(district_idx + 1).astype(str),
+            'hour': hour,
+            'day_of_week': day_of_week,
+            'month': month,
+            'temperature': np.round(temperature, 2),
+            'humidity': np.round(humidity, 2),
+            'wind_speed': np.round(wind_speed, 2),
+            'rainfall': np.round(rainfall, 2),
+            'industrial_load': np.round(industrial_load, 3),
+            'power_consumption_mw': np.round(consumption, 2)
+        })
     
     def _prepare_features(self, data):
-        """Prepare features for training"""
+        """Prepare features for training; returns scaled features, targets, encoders and scaler"""
+        from sklearn.preprocessing import StandardScaler, LabelEncoder
+        
         # Create label encoders
+        label_encoders = {}
         categorical_cols = ['state', 'district']
         for col in categorical_cols:
-            if col not in self.label_encoders:
-                self.label_encoders[col] = LabelEncoder()
-            data[col + '_encoded'] = self.label_encoders[col].fit_transform(data[col])
+            label_encoders[col] = LabelEncoder()
+            data[col + '_encoded'] = label_encoders[col].fit_transform(data[col])
         
-        # Feature engineering
+        X = self._engineer_features(data)
+        y = data['power_consumption_mw'].values
+        
+        # Scale features
+        scaler = StandardScaler()
+        X_scaled = scaler.fit_transform(X)
+        
+        return X_scaled, y, label_encoders, scaler
+    
+    def _engineer_features(self, data):
+        """Derive engineered columns and return the raw feature matrix"""
         data['temp_squared'] = data['temperature'] ** 2
         data['humidity_temp'] = data['humidity'] * data['temperature']
         data['is_peak_hour'] = ((data['hour'] >= 6) & (data['hour'] <= 9) | 
                                (data['hour'] >= 18) & (data['hour'] <= 22)).astype(int)
         data['is_weekend'] = (data['day_of_week'] >= 5).astype(int)
-        data['season'] = data['month'].apply(self._get_season)
-        
-        # Select features
-        feature_cols = [
-            'state_encoded', 'district_encoded', 'hour', 'day_of_week', 'month',
-            'temperature', 'humidity', 'wind_speed', 'rainfall', 'industrial_load',
-            'temp_squared', 'humidity_temp', 'is_peak_hour', 'is_weekend', 'season'
-        ]
+        data['season'] = SEASON_BY_MONTH[data['month'].to_numpy()]
         
-        self.feature_names = feature_cols
-        X = data[feature_cols].values
-        y = data['power_consumption_mw'].values
-        
-        # Scale features
-        X_scaled = self.scaler.fit_transform(X)
-        
-        return X_scaled, y
+        return data[FEATURE_COLUMNS].values
+    
+    def _parity_rows(self, model: ServingModel, n_samples: int = 2000):
+        """Unscaled feature rows from fresh synthetic data, for checking the compiled engine"""
+        data = self._generate_synthetic_data(n_samples, seed=7)
+        rng = np.random.default_rng(7)
+        for col in ['state', 'district']:
+            codes = data[col].map(model.class_codes(col))
+            # Models trained on the sample dataset know real district names, not synthetic ones
+            random_codes = rng.integers(0, len(model.label_encoders[col].classes_), len(data))
+            data[col + '_encoded'] = codes.where(codes.notna(), random_codes)
+        return self._engineer_features(data)
     
     def _get_season(self, month):
         if month in [3, 4, 5]:
@@ -231,166 +789,239 @@ class PowerConsumptionPredictor:
     
     async def predict(self, state: str, district: str, weather_data: dict, historical_data: list):
         """Make power consumption prediction"""
-        if not self.is_trained:
+        return await self._cached(
+            ('current', state, district, self._weather_key(weather_data)),
+            self._predict_sync, state, district, weather_data
+        )
+    
+    async def predict_24h(self, state: str, district: str, weather_data: dict, hours: int = 24):
+        """Generate hourly ahead predictions (24 by default, e.g. 168 for a week)"""
+        return await self._cached(
+            ('horizon', state, district, hours, self._weather_key(weather_data)),
+            self._predict_horizon_sync, state, district, weather_data, hours
+        )
+    
+    async def _cached(self, key: tuple, func, *args):
+        """Run `func` in the inference pool unless this hour already has a result for `key`"""
+        if self.prediction_cache is None:
+            return await self._run_inference(func, *args)
+        key = key + (datetime.now().strftime("%Y-%m-%d %H"),)
+        return await self.prediction_cache.get_or_load(key, lambda: self._run_inference(func, *args))
+    
+    def _weather_key(self, weather_data: dict) -> int:
+        """Hash of the model-relevant weather fields"""
+        return hash(tuple(
+            round(float(weather_data.get(field, 0)), 2)
+            for field in ('temperature', 'humidity', 'wind_speed', 'rainfall')
+        ))
+    
+    def cache_stats(self) -> dict:
+        return self.prediction_cache.stats() if self.prediction_cache is not None else {}
+    
+    async def predict_batch(self, locations: list, hours: int = 24):
+        """Predict current consumption and the hourly horizon for many locations at once
+        
+        `locations` is a list of dicts with `state`, `district` and `weather_data`.
+        Every row of every location is scored in a single pass through the ensemble.
+        Returns a list of `(prediction_result, predictions_24h)` tuples in input order.
+        """
+        return await self._run_inference(self._predict_batch_sync, locations, hours)
+    
+    def _predict_sync(self, state: str, district: str, weather_data: dict):
+        model = self.model
+        if model is None:
             raise Exception("Model not trained")
         
         try:
-            # Prepare input features
             current_time = datetime.now()
-            
-            # Encode categorical variables
-            state_encoded = self._encode_categorical('state', state)
-            district_encoded = self._encode_categorical('district', district)
-            
-            # Extract weather features
-            temperature = weather_data.get('temperature', 25)
-            humidity = weather_data.get('humidity', 60)
-            wind_speed = weather_data.get('wind_speed', 10)
-            rainfall = weather_data.get('rainfall', 0)
-            
-            # Calculate industrial load (simulated)
-            industrial_load = self._calculate_industrial_load(state, current_time)
-            
-            # Feature engineering
-            temp_squared = temperature ** 2
-            humidity_temp = humidity * temperature
-            is_peak_hour = int(6 <= current_time.hour <= 9 or 18 <= current_time.hour <= 22)
-            is_weekend = int(current_time.weekday() >= 5)
-            season = self._get_season(current_time.month)
-            
-            # Prepare feature vector
-            features = np.array([[
-                state_encoded, district_encoded, current_time.hour, current_time.weekday(),
-                current_time.month, temperature, humidity, wind_speed, rainfall,
-                industrial_load, temp_squared, humidity_temp, is_peak_hour, is_weekend, season
-            ]])
-            
-            # Scale features
-            features_scaled = self.scaler.transform(features)
+            rng = np.random.default_rng()
+            features, parameters = self._current_block(model, state, district, weather_data, current_time, rng)
             
             # Make predictions with both models
-            rf_pred = self.rf_model.predict(features_scaled)[0]
-            gb_pred = self.gb_model.predict(features_scaled)[0]
+            rf_pred, gb_pred = model.score(features)
             
-            # Ensemble prediction (weighted average)
-            final_prediction = 0.6 * rf_pred + 0.4 * gb_pred
-            
-            # Calculate confidence score
-            pred_std = np.abs(rf_pred - gb_pred)
-            confidence = max(0.5, 1 - (pred_std / final_prediction))
-            
-            return {
-                'prediction': round(final_prediction, 2),
-                'confidence': round(confidence, 3),
-                'parameters': {
-                    'temperature': temperature,
-                    'humidity': humidity,
-                    'wind_speed': wind_speed,
-                    'rainfall': rainfall,
-                    'industrial_load': round(industrial_load, 3),
-                    'hour': current_time.hour,
-                    'is_peak_hour': bool(is_peak_hour),
-                    'is_weekend': bool(is_weekend),
-                    'season': ['', 'Summer', 'Monsoon', 'Post-monsoon', 'Winter'][season]
-                }
-            }
+            return self._format_current(rf_pred[0], gb_pred[0], parameters)
             
         except Exception as e:
             logging.error(f"Prediction error: {e}")
             raise
     
-    async def predict_24h(self, state: str, district: str, weather_data: dict):
-        """Generate 24-hour ahead predictions"""
-        predictions = []
+    def _predict_horizon_sync(self, state: str, district: str, weather_data: dict, hours: int):
+        future_times = self._future_times(datetime.now(), hours)
+        values = np.zeros(hours)
         
-        for hour_offset in range(1, 25):
-            future_time = datetime.now() + timedelta(hours=hour_offset)
-            
-            # Simulate future weather (slight variations)
-            temp_variation = np.random.normal(0, 2)
-            future_weather = {
-                'temperature': weather_data['temperature'] + temp_variation,
-                'humidity': max(20, min(100, weather_data['humidity'] + np.random.normal(0, 5))),
-                'wind_speed': max(0, weather_data['wind_speed'] + np.random.normal(0, 3)),
-                'rainfall': max(0, weather_data['rainfall'] + np.random.normal(0, 1))
-            }
-            
-            # Make prediction for future time
-            prediction = await self._predict_for_time(
-                state, district, future_weather, future_time
-            )
-            
-            predictions.append({
-                'hour_offset': hour_offset,
-                'timestamp': future_time.isoformat(),
-                'prediction': prediction,
-                'hour': future_time.hour
-            })
+        model = self.model
+        if model is not None:
+            try:
+                # One generator per request; all perturbations drawn in a single batch
+                rng = np.random.default_rng()
+                features = self._horizon_block(model, state, district, weather_data, future_times, rng)
+                
+                # Score the whole horizon with a single call per model
+                rf_pred, gb_pred = model.score(features)
+                values = 0.6 * rf_pred + 0.4 * gb_pred
+                
+            except Exception as e:
+                logging.error(f"Time-specific prediction error: {e}")
         
-        return predictions
+        return self._format_horizon(future_times, values)
     
-    async def _predict_for_time(self, state: str, district: str, weather_data: dict, target_time: datetime):
-        """Make prediction for specific time"""
-        if not self.is_trained:
-            return 0
+    def _predict_batch_sync(self, locations: list, hours: int):
+        model = self.model
+        if model is None:
+            raise Exception("Model not trained")
         
         try:
-            state_encoded = self._encode_categorical('state', state)
-            district_encoded = self._encode_categorical('district', district)
-            
-            temperature = weather_data['temperature']
-            humidity = weather_data['humidity']
-            wind_speed = weather_data['wind_speed']
-            rainfall = weather_data['rainfall']
-            
-            industrial_load = self._calculate_industrial_load(state, target_time)
+            now = datetime.now()
+            future_times = self._future_times(now, hours)
+            rng = np.random.default_rng()
             
-            features = np.array([[
-                state_encoded, district_encoded, target_time.hour, target_time.weekday(),
-                target_time.month, temperature, humidity, wind_speed, rainfall,
-                industrial_load, temperature ** 2, humidity * temperature,
-                int(6 <= target_time.hour <= 9 or 18 <= target_time.hour <= 22),
-                int(target_time.weekday() >= 5), self._get_season(target_time.month)
-            ]])
+            blocks = []
+            parameters = []
+            for location in locations:
+                current, params = self._current_block(
+                    model, location['state'], location['district'], location['weather_data'], now, rng
+                )
+                horizon = self._horizon_block(
+                    model, location['state'], location['district'], location['weather_data'],
+                    future_times, rng
+                )
+                blocks.extend([current, horizon])
+                parameters.append(params)
             
-            features_scaled = self.scaler.transform(features)
+            rf_pred, gb_pred = model.score(np.vstack(blocks))
             
-            rf_pred = self.rf_model.predict(features_scaled)[0]
-            gb_pred = self.gb_model.predict(features_scaled)[0]
-            
-            return round(0.6 * rf_pred + 0.4 * gb_pred, 2)
+            # Each location owns one current row followed by `hours` horizon rows
+            stride = hours + 1
+            results = []
+            for i, params in enumerate(parameters):
+                start = i * stride
+                horizon = slice(start + 1, start + stride)
+                results.append((
+                    self._format_current(rf_pred[start], gb_pred[start], params),
+                    self._format_horizon(future_times, 0.6 * rf_pred[horizon] + 0.4 * gb_pred[horizon])
+                ))
+            return results
             
         except Exception as e:
-            logging.error(f"Time-specific prediction error: {e}")
-            return 0
+            logging.error(f"Batch prediction error: {e}")
+            raise
     
-    def _encode_categorical(self, column: str, value: str):
-        """Encode categorical variable"""
-        if column not in self.label_encoders:
-            return 0
-        
-        try:
-            return self.label_encoders[column].transform([value])[0]
-        except:
-            # Return most common class if unseen value
-            return 0
+    def _future_times(self, now: datetime, hours: int):
+        return [now + timedelta(hours=hour_offset) for hour_offset in range(1, hours + 1)]
     
-    def _calculate_industrial_load(self, state: str, time: datetime):
-        """Calculate industrial load factor"""
-        base_industrial = {
-            "Maharashtra": 0.85, "Karnataka": 0.75, "Tamil Nadu": 0.80,
-            "Gujarat": 0.90, "Rajasthan": 0.60, "West Bengal": 0.70,
-            "Uttar Pradesh": 0.65, "Haryana": 0.75, "Punjab": 0.70, "Delhi": 0.55
+    def _current_block(self, model: ServingModel, state: str, district: str, weather_data: dict,
+                       current_time: datetime, rng: np.random.Generator):
+        """Build the single feature row for `current_time` and its reported parameters"""
+        # Extract weather features
+        temperature = weather_data.get('temperature', 25)
+        humidity = weather_data.get('humidity', 60)
+        wind_speed = weather_data.get('wind_speed', 10)
+        rainfall = weather_data.get('rainfall', 0)
+        
+        # Calculate industrial load (simulated)
+        industrial_load = self._calculate_industrial_load(model, state, district, [current_time], rng)[0]
+        
+        features = self._build_features(
+            model, state, district, [current_time],
+            temperature, humidity, wind_speed, rainfall, industrial_load
+        )
+        
+        parameters = {
+            'temperature': temperature,
+            'humidity': humidity,
+            'wind_speed': wind_speed,
+            'rainfall': rainfall,
+            'industrial_load': round(float(industrial_load), 3),
+            'hour': current_time.hour,
+            'is_peak_hour': 6 <= current_time.hour <= 9 or 18 <= current_time.hour <= 22,
+            'is_weekend': current_time.weekday() >= 5,
+            'season': SEASON_NAMES[self._get_season(current_time.month)]
         }
+        return features, parameters
+    
+    def _horizon_block(self, model: ServingModel, state: str, district: str, weather_data: dict,
+                       future_times: list, rng: np.random.Generator):
+        """Build the feature rows for `future_times` with simulated weather drift"""
+        hours = len(future_times)
+        
+        # Simulate future weather (slight variations)
+        noise = rng.normal(0, WEATHER_NOISE_STD, size=(hours, 4))
+        temperature = weather_data['temperature'] + noise[:, 0]
+        humidity = np.clip(weather_data['humidity'] + noise[:, 1], 20, 100)
+        wind_speed = np.maximum(0, weather_data['wind_speed'] + noise[:, 2])
+        rainfall = np.maximum(0, weather_data['rainfall'] + noise[:, 3])
         
-        base = base_industrial.get(state, 0.70)
+        industrial_load = self._calculate_industrial_load(model, state, district, future_times, rng)
         
-        # Reduce on weekends
-        if time.weekday() >= 5:
-            base *= 0.7
+        return self._build_features(
+            model, state, district, future_times,
+            temperature, humidity, wind_speed, rainfall, industrial_load
+        )
+    
+    def _format_current(self, rf_pred: float, gb_pred: float, parameters: dict):
+        # Ensemble prediction (weighted average)
+        final_prediction = 0.6 * rf_pred + 0.4 * gb_pred
         
-        # Reduce at night
-        if 22 <= time.hour or time.hour <= 6:
-            base *= 0.6
+        # Calculate confidence score
+        pred_std = np.abs(rf_pred - gb_pred)
+        confidence = max(0.5, 1 - (pred_std / final_prediction))
         
-        return base + np.random.normal(0, 0.1)
\ No newline at end of file
+        return {
+            'prediction': round(float(final_prediction), 2),
+            'confidence': round(float(confidence), 3),
+            'parameters': parameters
+        }
+    
+    def _format_horizon(self, future_times: list, values: np.ndarray):
+        return [
+            {
+                'hour_offset': hour_offset,
+                'timestamp': future_time.isoformat(),
+                'prediction': round(float(value), 2),
+                'hour': future_time.hour
+            }
+            for hour_offset, (future_time, value) in enumerate(zip(future_times, values), start=1)
+        ]
+    
+    def _build_features(self, model: ServingModel, state: str, district: str, times: list,
+                        temperature, humidity, wind_speed, rainfall, industrial_load):
+        """Build the (n_times, n_features) feature matrix for one location
+        
+        Weather and industrial load may be scalars or arrays aligned with `times`.
+        Encodings and calendar features come from precomputed lookup tables.
+        """
+        state_encoded, district_encoded = model.location_features(state, district)[:2]
+        time_features = TIME_FEATURES[self._time_indices(times)]
+        
+        temperature = np.asarray(temperature, dtype=float)
+        humidity = np.asarray(humidity, dtype=float)
+        
+        # Column order follows FEATURE_COLUMNS
+        features = np.empty((len(times), len(FEATURE_COLUMNS)))
+        features[:, 0] = state_encoded
+        features[:, 1] = district_encoded
+        features[:, 2:5] = time_features[:, 0:3]    # hour, day_of_week, month
+        features[:, 5] = temperature
+        features[:, 6] = humidity
+        features[:, 7] = wind_speed
+        features[:, 8] = rainfall
+        features[:, 9] = industrial_load
+        features[:, 10] = temperature ** 2
+        features[:, 11] = humidity * temperature
+        features[:, 12:15] = time_features[:, 3:6]  # is_peak_hour, is_weekend, season
+        return features
+    
+    def _time_indices(self, times: list):
+        """(hour, weekday, month) index arrays into TIME_FEATURES"""
+        hour, day_of_week, month = np.array([(t.hour, t.weekday(), t.month) for t in times]).T
+        return hour, day_of_week, month
+    
+    def _calculate_industrial_load(self, model: ServingModel, state: str, district: str, times: list,
+                                   rng: np.random.Generator):
+        """Industrial load factor for each timestamp: base load, weekend/night reduction, noise"""
+        return self._expected_industrial_load(model, state, district, times) + rng.normal(0, 0.1, size=len(times))
+    
+    def _expected_industrial_load(self, model: ServingModel, state: str, district: str, times: list):
+        base = model.location_features(state, district)[2]
+        return base * TIME_FEATURES[self._time_indices(times)][:, 6]
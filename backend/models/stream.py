@@ -0,0 +1,122 @@
+import asyncio
+import itertools
+import logging
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+Location = Tuple[str, str]
+
+class Subscription:
+    """One stream client: the locations it follows and a bounded queue of updates
+
+    Every refresh queues one update per location, so the queue holds `queue_size`
+    refreshes whatever the number of locations.
+    """
+
+    def __init__(self, subscription_id: int, locations: Set[Location], queue_size: int):
+        self.id = subscription_id
+        self.locations = locations
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size * max(1, len(locations)))
+        self.dropped = False
+
+class PredictionBroadcaster:
+    """Computes updates once per location and fans them out to every subscriber
+
+    A single producer task calls `producer(locations)` for the union of all
+    subscribed locations every `interval` seconds, so upstream and model cost grow
+    with the number of distinct districts, not viewers. A subscriber more than
+    `queue_size` refreshes behind is dropped rather than buffered further; clients
+    reconnect and resume from the latest update.
+    """
+
+    def __init__(self, producer: Callable[[List[Location]], Awaitable[Dict[Location, dict]]],
+                 interval: float = 30.0, queue_size: int = 32):
+        self.producer = producer
+        self.interval = interval
+        self.queue_size = queue_size
+        self.subscriptions: Dict[int, Subscription] = {}
+        self.latest: Dict[Location, dict] = {}
+        self.dropped_total = 0
+        self._ids = itertools.count(1)
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+
+    def start(self):
+        if self._task is None:
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def subscribe(self, locations: Set[Location]) -> Subscription:
+        """Register a subscriber and queue the latest known update for each location"""
+        subscription = Subscription(next(self._ids), set(locations), self.queue_size)
+        self.subscriptions[subscription.id] = subscription
+
+        for location in subscription.locations:
+            if location in self.latest and not self._offer(subscription, self.latest[location]):
+                break
+        # Compute locations nobody was following yet without waiting a full interval
+        if self._wake is not None and any(location not in self.latest for location in locations):
+            self._wake.set()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        self.subscriptions.pop(subscription.id, None)
+
+    def subscribed_locations(self) -> List[Location]:
+        return sorted(set().union(*(s.locations for s in self.subscriptions.values())))
+
+    async def _run(self):
+        while True:
+            locations = self.subscribed_locations()
+            if locations:
+                started = time.monotonic()
+                try:
+                    updates = await self.producer(locations)
+                    self.publish(updates)
+                    logging.debug(f"Streamed {len(updates)} locations to {len(self.subscriptions)} "
+                                  f"subscribers in {time.monotonic() - started:.3f}s")
+                except Exception as e:
+                    logging.error(f"Prediction stream producer error: {e}")
+
+            # Forget updates for locations nobody follows any more
+            followed = set(self.subscribed_locations())
+            self.latest = {location: update for location, update in self.latest.items() if location in followed}
+
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def publish(self, updates: Dict[Location, dict]):
+        """Fan updates out to subscribers, dropping any whose queue is full"""
+        self.latest.update(updates)
+        for subscription in list(self.subscriptions.values()):
+            for location in subscription.locations:
+                update = updates.get(location)
+                if update is not None and not self._offer(subscription, update):
+                    break
+
+    def _offer(self, subscription: Subscription, update: dict) -> bool:
+        """Queue an update, or drop the subscriber when its queue is full"""
+        try:
+            subscription.queue.put_nowait(update)
+            return True
+        except asyncio.QueueFull:
+            subscription.dropped = True
+            self.dropped_total += 1
+            self.unsubscribe(subscription)
+            logging.warning(f"Dropped slow prediction stream subscriber {subscription.id}")
+            return False
+
+    def stats(self) -> dict:
+        return {
+            'subscribers': len(self.subscriptions),
+            'locations': len(self.subscribed_locations()),
+            'dropped_total': self.dropped_total
+        }
@@ -0,0 +1,69 @@
+"""Train the prediction model outside the API server
+
+    cd backend
+    python -m models.train                                  # synthetic rows, as at startup
+    python -m models.train --dataset data/india_power_consumption_dataset.csv
+
+The random forest uses every core while the boosting model is fit alongside it.
+Datasets of HIST_BOOSTING_MIN_ROWS rows or more use histogram-based boosting unless
+`--boosting gb` is given. Wall time and peak memory are reported per stage; the two
+fits overlap, so their shared peak is reported once under "fit". The model is
+written to models/trained_model.joblib; running servers reload it within
+MODEL_RELOAD_INTERVAL seconds, or on restart in mmap mode.
+"""
+import argparse
+import json
+import logging
+import shutil
+from typing import Optional
+
+from models.prediction_model import (
+    MAPPED_MODEL_PATH, PowerConsumptionPredictor, acquire_model_lock, release_model_lock, training_stage
+)
+
+# Sample dataset columns the model trains on; the rest are never loaded
+TRAINING_COLUMNS = ['state', 'district', 'hour', 'day_of_week', 'month', 'temperature', 'humidity',
+                    'wind_speed', 'rainfall', 'industrial_load', 'power_consumption_mw']
+
+def load_dataset(path: str):
+    """Training rows from a CSV in the sample dataset layout (data/sample_dataset.py)"""
+    import pandas as pd
+
+    return pd.read_csv(path, usecols=TRAINING_COLUMNS, dtype={'state': str, 'district': str})
+
+def train(dataset: Optional[str] = None, samples: int = 10000, boosting: str = "auto", n_jobs: int = -1) -> dict:
+    """Train and save the model under the model lock; returns the training report"""
+    # Servers compile their own engine when they load the model
+    predictor = PowerConsumptionPredictor(n_training_samples=samples, compiled_inference=False)
+    stages = {}
+    data = None
+    if dataset is not None:
+        with training_stage(stages, "load"):
+            data = load_dataset(dataset)
+
+    lock = acquire_model_lock()
+    try:
+        report = predictor.train_sync(data, boosting=boosting, n_jobs=n_jobs)
+        # A mapped copy of the previous model would be served instead; mmap servers re-export on start
+        shutil.rmtree(MAPPED_MODEL_PATH, ignore_errors=True)
+    finally:
+        release_model_lock(lock)
+
+    report['stages'] = {**stages, **report['stages']}
+    return report
+
+def main(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(description="Train the power consumption model")
+    parser.add_argument("--dataset", help="CSV from data/sample_dataset.py (default: synthetic rows)")
+    parser.add_argument("--samples", type=int, default=10000, help="synthetic rows when no dataset is given")
+    parser.add_argument("--boosting", choices=["auto", "gb", "hist"], default="auto",
+                        help="gradient boosting implementation (default: hist for large datasets)")
+    parser.add_argument("--n-jobs", type=int, default=-1, help="cores for the random forest (default: all)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    report = train(args.dataset, args.samples, args.boosting, args.n_jobs)
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
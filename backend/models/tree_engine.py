@@ -0,0 +1,201 @@
+import json
+import logging
+from pathlib import Path
+
+import numpy as np
+
+# Node arrays written by `save`, one .npy file each so they can be memory-mapped
+ARRAY_FIELDS = ('feature', 'threshold', 'children', 'value', 'roots')
+
+def _float32_boundary(threshold: np.ndarray) -> np.ndarray:
+    """Float64 cut-off equivalent to sklearn's `float32(x) <= threshold` test
+
+    sklearn casts inputs to float32 before comparing, and its thresholds often sit
+    exactly on float32 data values. Every x below the midpoint between the largest
+    float32 <= threshold and the next float32 rounds to a value <= threshold.
+    """
+    lower = threshold.astype(np.float32)
+    lower = np.where(lower.astype(np.float64) > threshold, np.nextafter(lower, np.float32(-np.inf)), lower)
+    upper = np.nextafter(lower, np.float32(np.inf))
+    return (lower.astype(np.float64) + upper.astype(np.float64)) / 2
+
+def _raw_threshold(threshold: np.ndarray, mean: np.ndarray, scale: np.ndarray) -> np.ndarray:
+    """Largest raw x whose StandardScaler value `(x - mean) / scale` is <= threshold
+
+    `threshold * scale + mean` can be off by a rounding step of `mean`, which flips
+    rows lying exactly on a split; histogram boosting thresholds are often data
+    values. Bisecting between bounds a few such steps either side finds the exact
+    cut-off.
+    """
+    raw = threshold * scale + mean
+    delta = 4 * np.spacing(np.abs(raw) + np.abs(mean) + np.abs(threshold * scale))
+    low, high = raw - delta, raw + delta
+    for _ in range(64):
+        mid = low + (high - low) / 2
+        below = (mid - mean) / scale <= threshold
+        low = np.where(below, mid, low)
+        high = np.where(below, high, mid)
+    return low
+
+def _sklearn_tree_nodes(tree):
+    """(feature, threshold, left, right, value, is_leaf, depth) of a fitted sklearn Tree"""
+    is_leaf = tree.children_left == -1
+    return (tree.feature, _float32_boundary(tree.threshold), tree.children_left, tree.children_right,
+            tree.value.reshape(tree.node_count), is_leaf, tree.max_depth)
+
+def _hist_predictor_nodes(predictor):
+    """The same for a HistGradientBoosting TreePredictor
+
+    Its thresholds already apply to float64 inputs (`x <= threshold` goes left) and
+    its leaf values include the learning rate. Missing values are not supported.
+    """
+    nodes = predictor.nodes
+    return (nodes['feature_idx'], nodes['num_threshold'].astype(np.float64), nodes['left'], nodes['right'],
+            nodes['value'], nodes['is_leaf'].astype(bool), int(nodes['depth'].max()))
+
+def _boosting_trees(gb_model):
+    """(tree nodes, weight) per boosting tree and the constant initial prediction"""
+    if hasattr(gb_model, '_predictors'):
+        # HistGradientBoostingRegressor; log-link losses would need an exp() after summing
+        if gb_model.loss in ('poisson', 'gamma'):
+            raise ValueError(f"Unsupported boosting loss: {gb_model.loss}")
+        trees = [(_hist_predictor_nodes(predictor), 1.0)
+                 for predictors in gb_model._predictors for predictor in predictors]
+        return trees, float(np.ravel(gb_model._baseline_prediction)[0])
+
+    trees = [(_sklearn_tree_nodes(estimator.tree_), gb_model.learning_rate)
+             for estimator in np.ravel(gb_model.estimators_)]
+    if gb_model.init_ == 'zero':
+        return trees, 0.0
+    return trees, float(np.ravel(gb_model.init_.predict(np.zeros((1, gb_model.n_features_in_))))[0])
+
+class TreeEnsembleEngine:
+    """Random forest + gradient boosting ensemble evaluated from flat NumPy node arrays
+
+    Every tree of both models lives in one set of node arrays, with the fitted
+    StandardScaler folded into the split thresholds so raw feature rows are scored
+    directly. Leaves point back to themselves with an infinite threshold, so scoring
+    is a fixed number of vectorized steps over all (row, tree) pairs at once.
+    """
+
+    def __init__(self, feature: np.ndarray, threshold: np.ndarray, children: np.ndarray,
+                 value: np.ndarray, roots: np.ndarray, max_depth: int, n_rf_trees: int,
+                 gb_bias: float):
+        self.feature = feature        # (n_nodes,) split feature index, 0 for leaves
+        self.threshold = threshold    # (n_nodes,) raw-space threshold, +inf for leaves
+        self.children = children      # (n_nodes, 2) left/right child, self for leaves
+        self.value = value            # (n_nodes,) leaf contribution, pre-weighted
+        self.roots = roots            # (n_trees,) root node of each tree
+        self.max_depth = int(max_depth)
+        self.n_rf_trees = int(n_rf_trees)
+        self.gb_bias = float(gb_bias)
+
+    @classmethod
+    def from_models(cls, rf_model, gb_model, scaler=None):
+        """Export fitted sklearn RandomForest and (Hist)GradientBoosting regressors (and scaler)"""
+        # RF averages its trees; boosting adds its (shrunken) trees to an initial estimate
+        rf_trees = [(_sklearn_tree_nodes(estimator.tree_), 1.0 / len(rf_model.estimators_))
+                    for estimator in rf_model.estimators_]
+        gb_trees, gb_bias = _boosting_trees(gb_model)
+
+        feature, threshold, children, value, roots = [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for (tree_feature, tree_threshold, left, right, leaf_value, is_leaf, depth), weight in rf_trees + gb_trees:
+            n_nodes = len(is_leaf)
+            node_ids = np.arange(offset, offset + n_nodes)
+
+            tree_feature = np.where(is_leaf, 0, tree_feature)
+            if scaler is not None:
+                # x_scaled <= t  <=>  x <= t * scale + mean  (scale > 0)
+                tree_threshold = _raw_threshold(tree_threshold, scaler.mean_[tree_feature],
+                                                scaler.scale_[tree_feature])
+            tree_threshold = np.where(is_leaf, np.inf, tree_threshold)
+
+            feature.append(tree_feature)
+            threshold.append(tree_threshold)
+            children.append(np.column_stack([
+                np.where(is_leaf, node_ids, left + offset),
+                np.where(is_leaf, node_ids, right + offset)
+            ]))
+            value.append(np.where(is_leaf, leaf_value * weight, 0.0))
+            roots.append(offset)
+
+            offset += n_nodes
+            max_depth = max(max_depth, depth)
+
+        return cls(
+            feature=np.concatenate(feature).astype(np.intp),
+            threshold=np.concatenate(threshold).astype(np.float64),
+            children=np.concatenate(children).astype(np.intp),
+            value=np.concatenate(value).astype(np.float64),
+            roots=np.asarray(roots, dtype=np.intp),
+            max_depth=max_depth,
+            n_rf_trees=len(rf_trees),
+            gb_bias=gb_bias
+        )
+
+    def save(self, directory: Path):
+        """Write the node arrays as .npy files plus a small JSON header"""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        for name in ARRAY_FIELDS:
+            np.save(directory / f"{name}.npy", getattr(self, name))
+        (directory / "engine.json").write_text(json.dumps({
+            'max_depth': self.max_depth,
+            'n_rf_trees': self.n_rf_trees,
+            'gb_bias': self.gb_bias
+        }))
+
+    @classmethod
+    def load(cls, directory: Path, mmap_mode: str = 'r'):
+        """Load saved node arrays; with `mmap_mode` every process maps the same pages"""
+        directory = Path(directory)
+        header = json.loads((directory / "engine.json").read_text())
+        arrays = {name: np.load(directory / f"{name}.npy", mmap_mode=mmap_mode) for name in ARRAY_FIELDS}
+        return cls(**arrays, **header)
+
+    def predict(self, X: np.ndarray, chunk_size: int = 512):
+        """Return `(rf_pred, gb_pred)` for raw (unscaled) feature rows"""
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        rf_pred = np.empty(X.shape[0])
+        gb_pred = np.empty(X.shape[0])
+
+        # Chunk rows so the (rows, trees) index arrays stay cache-sized
+        for start in range(0, X.shape[0], chunk_size):
+            leaf_values = self._leaf_values(X[start:start + chunk_size])
+            rf_pred[start:start + chunk_size] = leaf_values[:, :self.n_rf_trees].sum(axis=1)
+            gb_pred[start:start + chunk_size] = self.gb_bias + leaf_values[:, self.n_rf_trees:].sum(axis=1)
+        return rf_pred, gb_pred
+
+    def _leaf_values(self, X: np.ndarray) -> np.ndarray:
+        n_rows, n_features = X.shape
+        flat_X = X.ravel()
+        row_offset = (np.arange(n_rows) * n_features)[:, None]
+        flat_children = self.children.ravel()
+        node = np.broadcast_to(self.roots, (n_rows, len(self.roots)))
+
+        for _ in range(self.max_depth):
+            go_right = flat_X[row_offset + self.feature[node]] > self.threshold[node]
+            node = flat_children[2 * node + go_right]
+
+        return self.value[node]
+
+    def check_parity(self, rf_model, gb_model, scaler, X: np.ndarray,
+                     rtol: float = 1e-6, atol: float = 1e-3) -> bool:
+        """Compare against the sklearn models on raw rows `X`; True when they agree"""
+        X_scaled = scaler.transform(X) if scaler is not None else X
+        expected = 0.6 * rf_model.predict(X_scaled) + 0.4 * gb_model.predict(X_scaled)
+        rf_pred, gb_pred = self.predict(X)
+        actual = 0.6 * rf_pred + 0.4 * gb_pred
+
+        mismatched = ~np.isclose(actual, expected, rtol=rtol, atol=atol)
+        if mismatched.any():
+            logging.warning(
+                f"Compiled ensemble parity check failed on {mismatched.sum()}/{len(X)} rows "
+                f"(max abs diff {np.abs(actual - expected).max():.4f})"
+            )
+            return False
+        logging.info(f"Compiled ensemble parity check passed on {len(X)} rows "
+                     f"(max abs diff {np.abs(actual - expected).max():.2e})")
+        return True
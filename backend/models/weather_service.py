@@ -1,10 +1,18 @@
-import httpx
 import asyncio
-from typing import Dict
+import importlib.util
+from datetime import datetime
+from typing import Dict, Optional
 import logging
+import time
+
+from models.cache import TTLCache
+from models.metrics import WEATHER_REQUESTS
 
 class WeatherService:
-    def __init__(self):
+    def __init__(self, cache_ttl: float = 900, cache_stale_ttl: float = 3600,
+                 cache_max_entries: int = 1024, max_connections: int = 100,
+                 max_keepalive_connections: int = 20, keepalive_expiry: float = 30.0,
+                 timeout: float = 30.0, http2: bool = True, snapshot_max_age: float = 1800):
         self.base_url = "https://api.open-meteo.com/v1"
         self.geocoding_url = "https://geocoding-api.open-meteo.com/v1"
         
@@ -81,10 +89,61 @@ class WeatherService:
                 "East Delhi": (28.6508, 77.3152)
             }
         }
+        
+        # Current weather per coordinate; Open-Meteo updates roughly every 15 minutes
+        self.cache = TTLCache(ttl=cache_ttl, max_entries=cache_max_entries, stale_ttl=cache_stale_ttl)
+        
+        # One long-lived client so connections to Open-Meteo are pooled and kept alive
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.timeout = timeout
+        # HTTP/2 needs the optional `h2` package (httpx[http2])
+        self.http2 = http2 and importlib.util.find_spec("h2") is not None
+        self._client = None  # httpx.AsyncClient, imported lazily in start()
+        
+        # Bulk-refreshed current weather for every known district: (state, district) -> data
+        self.snapshot: Dict[tuple, Dict] = {}
+        self.snapshot_updated_at: Optional[float] = None
+        self.snapshot_max_age = snapshot_max_age
+        self._refresher: Optional[asyncio.Task] = None
+    
+    async def start(self):
+        """Open the shared HTTP client"""
+        if self._client is None:
+            import httpx
+            
+            limits = httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive_connections,
+                keepalive_expiry=self.keepalive_expiry
+            )
+            self._client = httpx.AsyncClient(timeout=self.timeout, limits=limits, http2=self.http2)
+            logging.info(f"Weather HTTP client started (http2={self.http2})")
+    
+    async def close(self):
+        """Stop the refresher and close the shared HTTP client and its pooled connections"""
+        if self._refresher is not None:
+            self._refresher.cancel()
+            self._refresher = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    async def _get_client(self):
+        if self._client is None:
+            await self.start()
+        return self._client
     
     async def get_weather_data(self, state: str, district: str) -> Dict:
         """Fetch current weather data for specified location"""
         try:
+            # Known districts are served from the bulk snapshot while it is fresh
+            if self._snapshot_is_fresh():
+                current = self.snapshot.get((state, district))
+                if current is not None:
+                    return current
+            
             coordinates = self._get_coordinates(state, district)
             if not coordinates:
                 # Default to state capital if district not found
@@ -92,36 +151,15 @@ class WeatherService:
             
             lat, lon = coordinates
             
-            async with httpx.AsyncClient(timeout=30) as client:
-                response = await client.get(
-                    f"{self.base_url}/forecast",
-                    params={
-                        "latitude": lat,
-                        "longitude": lon,
-                        "current": [
-                            "temperature_2m",
-                            "relative_humidity_2m",
-                            "wind_speed_10m",
-                            "precipitation"
-                        ],
-                        "timezone": "Asia/Kolkata"
-                    }
-                )
-                
-                response.raise_for_status()
-                data = response.json()
-                
-                current = data.get("current", {})
-                
-                return {
-                    "temperature": current.get("temperature_2m", 25),
-                    "humidity": current.get("relative_humidity_2m", 60),
-                    "wind_speed": current.get("wind_speed_10m", 10),
-                    "rainfall": current.get("precipitation", 0),
-                    "location": f"{district}, {state}",
-                    "coordinates": f"{lat:.4f}, {lon:.4f}",
-                    "last_updated": current.get("time", datetime.now().isoformat())
-                }
+            current = await self.cache.get_or_load(
+                (round(lat, 4), round(lon, 4)), lambda: self._fetch_current(lat, lon)
+            )
+            
+            return {
+                **current,
+                "location": f"{district}, {state}",
+                "coordinates": f"{lat:.4f}, {lon:.4f}"
+            }
                 
         except Exception as e:
             logging.error(f"Weather data fetch error: {e}")
@@ -137,6 +175,123 @@ class WeatherService:
                 "error": "Using simulated weather data"
             }
     
+    async def _fetch_current(self, lat: float, lon: float) -> Dict:
+        """Fetch current conditions for one coordinate from Open-Meteo"""
+        client = await self._get_client()
+        try:
+            response = await client.get(
+                f"{self.base_url}/forecast",
+                params=self._forecast_params(lat, lon)
+            )
+            response.raise_for_status()
+        except Exception:
+            WEATHER_REQUESTS.inc(kind="current", outcome="failure")
+            raise
+        
+        WEATHER_REQUESTS.inc(kind="current", outcome="success")
+        return self._parse_current(response.json())
+    
+    async def fetch_all(self) -> Dict[tuple, Dict]:
+        """Fetch current weather for every known district in one upstream request
+        
+        Open-Meteo accepts comma-separated coordinate lists and answers with one
+        result per location, in order. Refreshes `snapshot` and the coordinate cache.
+        """
+        locations = [
+            (state, district, lat, lon)
+            for state, districts in self.city_coordinates.items()
+            for district, (lat, lon) in districts.items()
+        ]
+        
+        client = await self._get_client()
+        try:
+            response = await client.get(
+                f"{self.base_url}/forecast",
+                params=self._forecast_params(
+                    ",".join(str(lat) for _, _, lat, _ in locations),
+                    ",".join(str(lon) for _, _, _, lon in locations)
+                )
+            )
+            response.raise_for_status()
+        except Exception:
+            WEATHER_REQUESTS.inc(kind="bulk", outcome="failure")
+            raise
+        WEATHER_REQUESTS.inc(kind="bulk", outcome="success")
+        
+        results = response.json()
+        if isinstance(results, dict):
+            results = [results]
+        if len(results) != len(locations):
+            raise ValueError(f"Expected {len(locations)} locations, got {len(results)}")
+        
+        snapshot = {}
+        for (state, district, lat, lon), result in zip(locations, results):
+            current = self._parse_current(result)
+            self.cache.set((round(lat, 4), round(lon, 4)), current)
+            snapshot[(state, district)] = {
+                **current,
+                "location": f"{district}, {state}",
+                "coordinates": f"{lat:.4f}, {lon:.4f}"
+            }
+        
+        # Swap the whole table at once so readers never see a partial refresh
+        self.snapshot = snapshot
+        self.snapshot_updated_at = time.monotonic()
+        return snapshot
+    
+    def start_refresher(self, interval: float):
+        """Run `fetch_all` every `interval` seconds in the background"""
+        if self._refresher is None:
+            self._refresher = asyncio.create_task(self._refresh_loop(interval))
+    
+    async def _refresh_loop(self, interval: float):
+        while True:
+            started = time.monotonic()
+            try:
+                await self.fetch_all()
+                logging.info(f"Weather snapshot refreshed for {len(self.snapshot)} districts "
+                             f"in {time.monotonic() - started:.2f}s")
+            except Exception as e:
+                logging.error(f"Weather snapshot refresh error: {e}")
+            await asyncio.sleep(interval)
+    
+    def _snapshot_is_fresh(self) -> bool:
+        return (self.snapshot_updated_at is not None
+                and time.monotonic() - self.snapshot_updated_at < self.snapshot_max_age)
+    
+    def _forecast_params(self, latitude, longitude) -> Dict:
+        return {
+            "latitude": latitude,
+            "longitude": longitude,
+            "current": [
+                "temperature_2m",
+                "relative_humidity_2m",
+                "wind_speed_10m",
+                "precipitation"
+            ],
+            "timezone": "Asia/Kolkata"
+        }
+    
+    def _parse_current(self, data: Dict) -> Dict:
+        current = data.get("current", {})
+        
+        return {
+            "temperature": current.get("temperature_2m", 25),
+            "humidity": current.get("relative_humidity_2m", 60),
+            "wind_speed": current.get("wind_speed_10m", 10),
+            "rainfall": current.get("precipitation", 0),
+            "last_updated": current.get("time", datetime.now().isoformat())
+        }
+    
+    def cache_stats(self) -> Dict:
+        stats = self.cache.stats()
+        stats['snapshot_districts'] = len(self.snapshot)
+        stats['snapshot_age_seconds'] = (
+            round(time.monotonic() - self.snapshot_updated_at, 1)
+            if self.snapshot_updated_at is not None else None
+        )
+        return stats
+    
     def _get_coordinates(self, state: str, district: str):
         """Get coordinates for state and district"""
         state_data = self.city_coordinates.get(state)
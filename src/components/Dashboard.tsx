@@ -1,11 +1,11 @@
-import React, { useState } from 'react';
-import { useQuery } from '@tanstack/react-query';
+import React, { useEffect, useState } from 'react';
+import { useQuery, useQueryClient } from '@tanstack/react-query';
 import Header from './Header';
 import StateSelector from './StateSelector';
 import PredictionCards from './PredictionCards';
 import ChartsSection from './ChartsSection';
 import WeatherPanel from './WeatherPanel';
-import { fetchPrediction, fetchStates, fetchHistory } from '../services/api';
+import { fetchPrediction, fetchStates, fetchHistory, subscribePredictions } from '../services/api';
 
 const Dashboard: React.FC = () => {
   const [selectedState, setSelectedState] = useState<string>('');
@@ -20,9 +20,17 @@ const Dashboard: React.FC = () => {
     queryKey: ['prediction', selectedState, selectedDistrict],
     queryFn: () => fetchPrediction(selectedState, selectedDistrict),
     enabled: !!(selectedState && selectedDistrict),
-    refetchInterval: 30000, // Auto-refresh every 30 seconds
   });
 
+  // Live updates are pushed by the server instead of polling every 30 seconds
+  const queryClient = useQueryClient();
+  useEffect(() => {
+    if (!selectedState || !selectedDistrict) return;
+    return subscribePredictions([{ state: selectedState, district: selectedDistrict }], (data) => {
+      queryClient.setQueryData(['prediction', selectedState, selectedDistrict], data);
+    });
+  }, [queryClient, selectedState, selectedDistrict]);
+
   const { data: historyData } = useQuery({
     queryKey: ['history', selectedState, selectedDistrict],
     queryFn: () => fetchHistory(selectedState, selectedDistrict),
@@ -104,4 +104,27 @@ export const fetchHistory = async (state: string, district: string) => {
     
     return { history: mockHistory };
   }
-};
\ No newline at end of file
+};
+
+// Subscribe to server-pushed predictions for one or more districts.
+// Returns a function that closes the stream; EventSource reconnects on errors.
+export const subscribePredictions = (
+  locations: { state: string; district: string }[],
+  onPrediction: (data: PredictionData) => void
+): (() => void) => {
+  const params = new URLSearchParams();
+  locations.forEach(({ state, district }) => params.append('location', `${state}:${district}`));
+  const source = new EventSource(`${API_BASE_URL}/stream?${params.toString()}`);
+  let unsubscribe = () => source.close();
+
+  source.addEventListener('prediction', (event) => {
+    onPrediction(JSON.parse((event as MessageEvent).data));
+  });
+  source.addEventListener('dropped', () => {
+    // The server dropped us for falling behind; reconnect to resume from the latest update
+    source.close();
+    unsubscribe = subscribePredictions(locations, onPrediction);
+  });
+
+  return () => unsubscribe();
+};